@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+
+def category_key(alert_id: str) -> str | None:
+    if not isinstance(alert_id, str) or "-" not in alert_id:
+        return None
+    return alert_id.split("-", 1)[0]
+
+
+def is_active(alert: dict) -> bool:
+    try:
+        return int(alert.get("value", 1)) != 1
+    except Exception:
+        return False
+
+
+def severity(active_alerts: list[dict]) -> str:
+    if any(a.get("alertType") == "Error" for a in active_alerts):
+        return "Error"
+    if any(a.get("alertType") == "Warning" for a in active_alerts):
+        return "Warning"
+    return "OK"
+
+
+@dataclass(frozen=True, slots=True)
+class AlertIndex:
+    """One unit's alerts, classified once per alerts refresh for entities to look up.
+
+    Only `alerts` takes part in equality; everything else is derived from it.
+    """
+
+    alerts: list[dict]
+    active: list[dict] = field(compare=False)
+    active_ids: frozenset[str] = field(compare=False)
+    active_by_category: dict[str, list[dict]] = field(compare=False)
+    severity: str = field(compare=False)
+    category_severity: dict[str, str] = field(compare=False)
+
+    @classmethod
+    def build(cls, alerts: Any) -> AlertIndex:
+        if not isinstance(alerts, list):
+            alerts = []
+
+        active: list[dict] = []
+        active_by_category: dict[str, list[dict]] = {}
+        for alert in alerts:
+            if not isinstance(alert, dict):
+                continue
+            if is_active(alert):
+                active.append(alert)
+                cat = category_key(alert.get("alertId", ""))
+                if cat is not None:
+                    active_by_category.setdefault(cat, []).append(alert)
+
+        return cls(
+            alerts=alerts,
+            active=active,
+            active_ids=frozenset(a.get("alertId") for a in active),
+            active_by_category=active_by_category,
+            severity=severity(active),
+            category_severity={cat: severity(items) for cat, items in active_by_category.items()},
+        )
+
+    def category_active(self, cat: str) -> list[dict]:
+        return self.active_by_category.get(cat, [])
+
+    def category_status(self, cat: str) -> str:
+        return self.category_severity.get(cat, "OK")
+
+    def is_active(self, alert_id: str) -> bool:
+        return alert_id in self.active_ids
+
+
+EMPTY_ALERTS = AlertIndex.build([])
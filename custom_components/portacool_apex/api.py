@@ -5,11 +5,17 @@ import base64
 import json
 import logging
 import time
+from collections.abc import AsyncIterator, Callable, Mapping
 from typing import Any
 from urllib.parse import quote
 
 import aiohttp
 
+try:
+    import orjson
+except ImportError:  # Home Assistant ships orjson; a bare aiohttp setup may not
+    orjson = None
+
 from .const import (
     API_BASE,
     ALERTS_LATEST_ENDPOINT,
@@ -17,55 +23,162 @@ from .const import (
     FIREBASE_CUSTOM_TOKEN_ENDPOINT,
     FIREBASE_DB,
     FIREBASE_WEB_API_KEY_DEFAULT,
+    IDENTITY_TOOLKIT_BASE,
     INVOKE_ACTION_ENDPOINT,
+    STREAM_READ_TIMEOUT_SECONDS,
+    VERIFY_CUSTOM_TOKEN_ENDPOINT,
 )
+from .metrics import EndpointStats, error_key
+from .resilience import CircuitBreaker, backoff_delay
 
 _LOGGER = logging.getLogger(__name__)
 
 DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=20)
 
+# Max in-flight requests per endpoint group. Each group has its own semaphore so a slow
+# alerts poll or RTDB read never holds up a command (invoke has a dedicated lane).
+ENDPOINT_CONCURRENCY = {
+    "rest": 4,  # PortaCool REST reads (devices, alerts, firebase-custom-token)
+    "identity": 2,  # Google Identity Toolkit (verifyCustomToken)
+    "rtdb": 4,  # Firebase RTDB reads
+    "invoke": 2,  # device commands
+}
+
+# Endpoint groups by the cloud host behind them; each host gets one circuit breaker
+SLOT_HOST = {
+    "rest": "portacool",
+    "invoke": "portacool",
+    "identity": "firebase",
+    "rtdb": "firebase",
+}
+
+# Endpoints with request metrics (signin is counted by the auth helper); the device node
+# read covers RTDB datapoints and timer together
+ENDPOINTS = (
+    "devices",
+    "alerts",
+    "invoke",
+    "firebase_custom_token",
+    "verify_custom_token",
+    "rtdb_node",
+)
+
+# Transient failures of idempotent calls are retried up to RETRY_ATTEMPTS more times
+RETRY_ATTEMPTS = 2
+RETRY_BASE_DELAY_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 5.0
+
+# Consecutive failures that open a host's circuit, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 60.0
+
+# Response bodies at least this large are decoded in the executor, off the event loop
+# (a full devices/my page runs to several hundred KB)
+OFFLOAD_DECODE_BYTES = 64 * 1024
+
+
+def decode_json(body: bytes) -> Any:
+    """Decode a JSON response straight from its bytes; an empty or `null` body gives None."""
+    # Only tiny bodies can be empty/null, so never copy a large one just to strip it
+    if len(body) <= 8 and body.strip() in (b"", b"null"):
+        return None
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
 class PortaCoolApexAPI:
+    """Account-level cloud client: one REST login and one Firebase identity for every unit."""
+
     def __init__(
         self,
         session: aiohttp.ClientSession,
         auth,
-        device_id: str,
-        device_type_id: int,
         firebase_web_api_key: str | None = None,
+        *,
+        api_base: str = API_BASE,
+        firebase_db: str = FIREBASE_DB,
+        identity_base: str = IDENTITY_TOOLKIT_BASE,
     ) -> None:
         self._session = session
         self._auth = auth
-        self._device_id = device_id
-        self._device_type_id = int(device_type_id)
-        self._lock = asyncio.Lock()
+        # Service roots; only overridden to point at a stand-in (scripts/mock_cloud.py)
+        self._api_base = api_base.rstrip("/")
+        self._firebase_db = firebase_db.rstrip("/")
+        self._identity_base = identity_base.rstrip("/")
+        self._slots = {
+            name: asyncio.BoundedSemaphore(limit) for name, limit in ENDPOINT_CONCURRENCY.items()
+        }
+        self._breakers = {
+            host: CircuitBreaker(host, BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS)
+            for host in sorted(set(SLOT_HOST.values()))
+        }
+        self._endpoint_stats = {name: EndpointStats() for name in ENDPOINTS}
 
         # Firebase Identity Toolkit key (public); allow override via OptionsFlow
         self._firebase_web_api_key = (firebase_web_api_key or FIREBASE_WEB_API_KEY_DEFAULT).strip()
-        self._verify_custom_token_url = (
-            "https://www.googleapis.com/identitytoolkit/v3/relyingparty/"
-            f"verifyCustomToken?key={self._firebase_web_api_key}"
-        )
+        self._verify_custom_token_url = self._verify_url()
 
         # Cached Firebase identity
         self._fb_id_token: str | None = None
         self._fb_uid: str | None = None
         self._fb_exp: float = 0
+        # In-flight custom-token -> verifyCustomToken exchange (single-flight)
+        self._fb_task: asyncio.Future | None = None
+
+        # Last RTDB node per device as (etag, datapoints, timer_info), and read counters
+        self._rtdb_nodes: dict[str, tuple[str | bytes, dict[int, str], dict[str, Any]]] = {}
+        self.rtdb_stats: dict[str, float] = {
+            "reads": 0,
+            "unchanged": 0,
+            "bytes": 0,
+            "parse_seconds": 0.0,
+        }
 
-    @property
-    def device_id(self) -> str:
-        return self._device_id
+        # Called after every new Firebase identity (used to persist it across restarts)
+        self.on_identity_updated: Callable[[], None] | None = None
 
     def set_firebase_web_api_key(self, key: str | None) -> None:
-        """Update key at runtime (used when Options change and entry reloads)."""
+        """Update key at runtime (applied live when the option changes)."""
         self._firebase_web_api_key = (key or FIREBASE_WEB_API_KEY_DEFAULT).strip()
-        self._verify_custom_token_url = (
-            "https://www.googleapis.com/identitytoolkit/v3/relyingparty/"
-            f"verifyCustomToken?key={self._firebase_web_api_key}"
-        )
+        self._verify_custom_token_url = self._verify_url()
         # Force re-auth next read
         self._fb_id_token = None
         self._fb_uid = None
         self._fb_exp = 0
+        self._fb_task = None
+
+    def _verify_url(self) -> str:
+        return (
+            f"{self._identity_base}{VERIFY_CUSTOM_TOKEN_ENDPOINT}"
+            f"?key={quote(self._firebase_web_api_key, safe='')}"
+        )
+
+    def export_identity(self) -> dict[str, Any]:
+        return {
+            "id_token": self._fb_id_token,
+            "uid": self._fb_uid,
+            "exp": self._fb_exp,
+            "web_api_key": self._firebase_web_api_key,
+        }
+
+    def restore_identity(self, data: dict[str, Any] | None) -> None:
+        """Reuse a Firebase identity saved by a previous run if it is still valid."""
+        if not isinstance(data, dict):
+            return
+        # An idToken minted through a different web API key is not ours to reuse
+        if data.get("web_api_key") != self._firebase_web_api_key:
+            return
+        id_token = data.get("id_token")
+        uid = data.get("uid")
+        try:
+            exp = float(data.get("exp") or 0)
+        except (TypeError, ValueError):
+            return
+        if isinstance(id_token, str) and id_token and uid and time.time() < exp - 60:
+            self._fb_id_token = id_token
+            self._fb_uid = str(uid)
+            self._fb_exp = exp
 
     async def _headers(self) -> dict[str, str]:
         if self._auth.is_expired():
@@ -76,107 +189,208 @@ class PortaCoolApexAPI:
             "Accept": "application/json",
         }
 
-    async def _get_text(
+    async def _authorize(self, url: str, auth: str | None) -> tuple[str, dict[str, str] | None]:
+        """Attach the current credentials for `auth` ("rest", "firebase" or None)."""
+        if auth == "rest":
+            return url, await self._headers()
+        if auth == "firebase":
+            id_token, _ = await self._get_firebase_id_token_and_uid()
+            sep = "&" if "?" in url else "?"
+            return f"{url}{sep}auth={quote(id_token, safe='')}", None
+        return url, None
+
+    async def _reauthenticate(self, auth: str) -> None:
+        """Drop credentials the server just rejected so the next attempt uses fresh ones."""
+        if auth == "rest":
+            await self._auth.refresh()
+        elif auth == "firebase":
+            self._fb_exp = 0
+
+    async def _send(
         self,
+        method: str,
         url: str,
+        slot: str,
+        endpoint: str,
+        headers: dict[str, str] | None,
+        payload: dict[str, Any] | None,
+        timeout: aiohttp.ClientTimeout | None,
+    ) -> tuple[bytes, Mapping[str, str]]:
+        stats = self._endpoint_stats[endpoint]
+        queued = time.monotonic()
+        async with self._slots[slot]:
+            started = time.monotonic()
+            try:
+                async with self._session.request(
+                    method,
+                    url,
+                    json=payload,
+                    headers=headers,
+                    timeout=timeout or DEFAULT_TIMEOUT,
+                ) as resp:
+                    body = await resp.read()
+                    if resp.status >= 400:
+                        raise aiohttp.ClientResponseError(
+                            resp.request_info,
+                            resp.history,
+                            status=resp.status,
+                            message=body.decode("utf-8", "replace"),
+                            headers=resp.headers,
+                        )
+            except Exception as err:
+                stats.record(
+                    time.monotonic() - started, error=error_key(err), slot_wait=started - queued
+                )
+                raise
+            stats.record(time.monotonic() - started, size=len(body), slot_wait=started - queued)
+            return body, resp.headers
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        endpoint: str,
+        slot: str = "rest",
+        auth: str | None = "rest",
+        payload: dict[str, Any] | None = None,
         headers: dict[str, str] | None = None,
+        idempotent: bool = True,
         timeout: aiohttp.ClientTimeout | None = None,
-    ) -> str:
-        async with self._lock:
-            async with self._session.get(
-                url,
-                headers=headers,
-                timeout=timeout or DEFAULT_TIMEOUT,
-            ) as resp:
-                body = await resp.text()
-                if resp.status >= 400:
-                    raise aiohttp.ClientResponseError(
-                        resp.request_info,
-                        resp.history,
-                        status=resp.status,
-                        message=body,
-                        headers=resp.headers,
-                    )
-                return body
-
-    async def _get_json(self, url: str, headers: dict[str, str] | None = None) -> Any:
-        text = await self._get_text(url, headers=headers)
-        if text.strip() in ("", "null"):
-            return None
-        return json.loads(text)
+    ) -> tuple[bytes, Mapping[str, str]]:
+        """One logical cloud call; returns (raw body, response headers).
+
+        Guarded by the host's circuit breaker. A 401/403 re-authenticates once and retries
+        (the server rejected the request, so this is safe even for commands); transient
+        failures (network, timeout, 429, 5xx) are retried with jittered exponential backoff,
+        but only when `idempotent`.
+        """
+        breaker = self._breakers[SLOT_HOST[slot]]
+        attempt = 0
+        reauthed = False
+        while True:
+            # Credentials first: minting them goes through other calls and their own breakers
+            full_url, auth_headers = await self._authorize(url, auth)
+            if headers:
+                auth_headers = {**(auth_headers or {}), **headers}
+            breaker.before_call()
+            try:
+                result = await self._send(
+                    method, full_url, slot, endpoint, auth_headers, payload, timeout
+                )
+            except aiohttp.ClientResponseError as err:
+                if err.status in (401, 403) and auth is not None and not reauthed:
+                    # The host answered; it is the credentials that are stale
+                    breaker.record_success()
+                    reauthed = True
+                    _LOGGER.debug("%s %s rejected (%s); re-authenticating", method, slot, err.status)
+                    await self._reauthenticate(auth)
+                    continue
+                transient = err.status == 429 or err.status >= 500
+                if transient:
+                    breaker.record_failure(err)
+                else:
+                    breaker.record_success()
+                if not (transient and idempotent) or attempt >= RETRY_ATTEMPTS:
+                    raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                breaker.record_failure(err)
+                if not idempotent or attempt >= RETRY_ATTEMPTS:
+                    raise
+            except BaseException:
+                # Cancelled mid-call: no verdict on the host, free a half-open trial
+                breaker.release_trial()
+                raise
+            else:
+                breaker.record_success()
+                return result
+
+            delay = backoff_delay(attempt, RETRY_BASE_DELAY_SECONDS, RETRY_MAX_DELAY_SECONDS)
+            attempt += 1
+            _LOGGER.debug("Retrying %s %s in %.1fs (attempt %s)", method, slot, delay, attempt + 1)
+            await asyncio.sleep(delay)
+
+    async def _get_json(
+        self, url: str, *, endpoint: str, slot: str = "rest", auth: str | None = "rest"
+    ) -> Any:
+        body, _ = await self._request("GET", url, endpoint=endpoint, slot=slot, auth=auth)
+        return await self._decode(body)
 
     async def _post_json(
         self,
         url: str,
         payload: dict[str, Any],
-        headers: dict[str, str] | None = None,
-        timeout: aiohttp.ClientTimeout | None = None,
+        *,
+        endpoint: str,
+        slot: str = "rest",
+        auth: str | None = "rest",
     ) -> Any:
-        async with self._lock:
-            async with self._session.post(
-                url,
-                json=payload,
-                headers=headers,
-                timeout=timeout or DEFAULT_TIMEOUT,
-            ) as resp:
-                body = await resp.text()
-                if resp.status >= 400:
-                    raise aiohttp.ClientResponseError(
-                        resp.request_info,
-                        resp.history,
-                        status=resp.status,
-                        message=body,
-                        headers=resp.headers,
-                    )
-                if body.strip() in ("", "null"):
-                    return None
-                return json.loads(body)
+        """POST that only reads (alerts, token exchange), so it is retried like a GET."""
+        body, _ = await self._request(
+            "POST", url, endpoint=endpoint, slot=slot, auth=auth, payload=payload
+        )
+        return await self._decode(body)
 
-    async def invoke(self, datapoint_id: int, value: str) -> None:
+    @staticmethod
+    async def _decode(body: bytes) -> Any:
+        if len(body) < OFFLOAD_DECODE_BYTES:
+            return decode_json(body)
+        return await asyncio.get_running_loop().run_in_executor(None, decode_json, body)
+
+    def resilience_state(self) -> dict[str, Any]:
+        """Circuit breaker state per cloud host, for diagnostics."""
+        return {name: breaker.as_dict() for name, breaker in self._breakers.items()}
+
+    def request_stats(self) -> dict[str, dict[str, Any]]:
+        """Request counts, errors, bytes, latency and slot wait per cloud endpoint."""
+        out = {"signin": self._auth.request_stats.as_dict()}
+        out.update((name, stats.as_dict()) for name, stats in self._endpoint_stats.items())
+        return out
+
+    async def invoke(self, device_id: str, device_type_id: int, datapoint_id: int, value: str) -> None:
         payload: dict[str, Any] = {
-            "uniqueId": self._device_id,
-            "deviceTypeId": self._device_type_id,
+            "uniqueId": device_id,
+            "deviceTypeId": int(device_type_id),
             "datapointId": int(datapoint_id),
             "value": str(value),
         }
-        async with self._lock:
-            async with self._session.post(
-                f"{API_BASE}{INVOKE_ACTION_ENDPOINT}",
-                headers=await self._headers(),
-                json=payload,
-            ) as resp:
-                if resp.status >= 400:
-                    body = await resp.text()
-                    raise aiohttp.ClientResponseError(
-                        resp.request_info,
-                        resp.history,
-                        status=resp.status,
-                        message=body,
-                        headers=resp.headers,
-                    )
+        # Not retried on transient errors: a timed-out command may still have been applied
+        await self._request(
+            "POST",
+            f"{self._api_base}{INVOKE_ACTION_ENDPOINT}",
+            endpoint="invoke",
+            slot="invoke",
+            payload=payload,
+            idempotent=False,
+        )
 
     async def get_devices(self) -> list[dict]:
         """Used by config_flow to discover devices."""
-        url = f"{API_BASE}{DEVICES_MY_ENDPOINT}?page=1&pageSize=1000"
-        data = await self._get_json(url, headers=await self._headers())
+        url = f"{self._api_base}{DEVICES_MY_ENDPOINT}?page=1&pageSize=1000"
+        data = await self._get_json(url, endpoint="devices")
         if isinstance(data, dict):
             items = data.get("items", [])
             return items if isinstance(items, list) else []
         return []
 
-    async def get_alerts_latest(self) -> list[dict]:
-        url = f"{API_BASE}{ALERTS_LATEST_ENDPOINT}"
-        payload = {"uniqueIds": [self._device_id]}
-        data = await self._post_json(url, payload, headers=await self._headers())
+    async def get_alerts_latest(self, device_ids: list[str]) -> dict[str, list[dict]]:
+        """Fetch latest alerts for several devices in one POST; returns {uniqueId: alerts}."""
+        out: dict[str, list[dict]] = {device_id: [] for device_id in device_ids}
+        if not device_ids:
+            return out
+
+        url = f"{self._api_base}{ALERTS_LATEST_ENDPOINT}"
+        payload = {"uniqueIds": list(device_ids)}
+        data = await self._post_json(url, payload, endpoint="alerts")
 
         if not isinstance(data, list):
-            return []
+            return out
 
         for d in data:
-            if isinstance(d, dict) and d.get("uniqueId") == self._device_id:
+            if isinstance(d, dict) and d.get("uniqueId") in out:
                 alerts = d.get("alerts", [])
-                return alerts if isinstance(alerts, list) else []
-        return []
+                out[d["uniqueId"]] = alerts if isinstance(alerts, list) else []
+        return out
 
     # ---------------- Firebase helpers ----------------
 
@@ -201,23 +415,30 @@ class PortaCoolApexAPI:
             return {}
         payload_b64 = parts[1] + "=" * (-len(parts[1]) % 4)
         raw = base64.urlsafe_b64decode(payload_b64.encode("utf-8"))
-        return json.loads(raw.decode("utf-8"))
+        return json.loads(raw)
 
     async def _get_firebase_id_token_and_uid(self) -> tuple[str, str]:
         now = time.time()
         if self._fb_id_token and self._fb_uid and now < self._fb_exp - 60:
             return self._fb_id_token, self._fb_uid
 
+        # Every caller that finds the identity expired shares one exchange
+        if self._fb_task is None or self._fb_task.done():
+            self._fb_task = asyncio.ensure_future(self._exchange_firebase_identity())
+        return await asyncio.shield(self._fb_task)
+
+    async def _exchange_firebase_identity(self) -> tuple[str, str]:
         custom_raw = await self._get_json(
-            f"{API_BASE}{FIREBASE_CUSTOM_TOKEN_ENDPOINT}",
-            headers=await self._headers(),
+            f"{self._api_base}{FIREBASE_CUSTOM_TOKEN_ENDPOINT}", endpoint="firebase_custom_token"
         )
         custom_token = self._extract_custom_token(custom_raw)
 
         resp = await self._post_json(
             self._verify_custom_token_url,
             {"returnSecureToken": True, "token": custom_token},
-            headers={"Content-Type": "application/json"},
+            endpoint="verify_custom_token",
+            slot="identity",
+            auth=None,
         )
         if not isinstance(resp, dict) or "idToken" not in resp:
             raise RuntimeError(f"verifyCustomToken did not return idToken: {resp}")
@@ -232,6 +453,9 @@ class PortaCoolApexAPI:
         self._fb_id_token = id_token
         self._fb_uid = str(uid)
         self._fb_exp = float(exp)
+
+        if self.on_identity_updated is not None:
+            self.on_identity_updated()
         return self._fb_id_token, self._fb_uid
 
     @staticmethod
@@ -251,16 +475,129 @@ class PortaCoolApexAPI:
                     out[dp_id] = str(v["value"])
         return out
 
-    async def get_rtdb_state(self) -> tuple[dict[int, str], dict[str, Any]]:
+    @classmethod
+    def _split_device_node(cls, node: Any) -> tuple[dict[int, str], dict[str, Any]]:
+        """Split a /users/{uid}/{device} node into (datapoints, timer_info)."""
+        if not isinstance(node, dict):
+            return {}, {}
+        timer_node = node.get("timer")
+        datapoints = cls._parse_datapoints_node(node.get("datapoints"))
+        timer_info: dict[str, Any] = timer_node if isinstance(timer_node, dict) else {}
+        return datapoints, timer_info
+
+    async def get_rtdb_state(self, device_id: str) -> tuple[dict[int, str], dict[str, Any]]:
+        """Read datapoints and timer in one round trip by fetching the whole device node.
+
+        Firebase has no conditional GET, so the node is always downloaded, but its ETag
+        tells us whether it changed. When it did not, the previously parsed objects are
+        returned as-is (same identity), so callers can skip work with an `is` check.
+        """
+        _, uid = await self._get_firebase_id_token_and_uid()
+        body, headers = await self._request(
+            "GET",
+            f"{self._firebase_db}/users/{uid}/{device_id}.json",
+            endpoint="rtdb_node",
+            slot="rtdb",
+            auth="firebase",
+            headers={"X-Firebase-ETag": "true"},
+        )
+        stats = self.rtdb_stats
+        stats["reads"] += 1
+        stats["bytes"] += len(body)
+
+        # Fall back to the body itself if the server ever omits the ETag
+        tag = headers.get("ETag") or body
+        cached = self._rtdb_nodes.get(device_id)
+        if cached is not None and cached[0] == tag:
+            stats["unchanged"] += 1
+            return cached[1], cached[2]
+
+        started = time.perf_counter()
+        datapoints, timer_info = self._split_device_node(decode_json(body))
+        stats["parse_seconds"] += time.perf_counter() - started
+
+        self._rtdb_nodes[device_id] = (tag, datapoints, timer_info)
+        return datapoints, timer_info
+
+    async def stream_rtdb(self, device_id: str) -> AsyncIterator[tuple[str, str, Any]]:
+        """Yield (event, path, data) from a Firebase REST event stream on the device node.
+
+        The first event is a `put` at path "/" carrying the whole node; later events are
+        incremental `put`/`patch` changes relative to it. The generator ends when the
+        idToken is about to expire or is revoked, or when the server cancels the stream;
+        the caller is expected to reconnect (a fresh idToken is fetched on the next call).
+        """
         id_token, uid = await self._get_firebase_id_token_and_uid()
         auth_q = quote(id_token, safe="")
+        url = f"{self._firebase_db}/users/{uid}/{device_id}.json?auth={auth_q}"
 
-        dp_url = f"{FIREBASE_DB}/users/{uid}/{self._device_id}/datapoints.json?auth={auth_q}"
-        timer_url = f"{FIREBASE_DB}/users/{uid}/{self._device_id}/timer.json?auth={auth_q}"
+        # Close the stream shortly before the idToken expires so we reconnect with a new one
+        rotate_at = self._fb_exp - 60
+        timeout = aiohttp.ClientTimeout(
+            total=max(60.0, rotate_at - time.time()),
+            sock_read=STREAM_READ_TIMEOUT_SECONDS,
+        )
 
-        dp_node = await self._get_json(dp_url)
-        timer_node = await self._get_json(timer_url)
+        try:
+            async with self._session.get(
+                url,
+                headers={"Accept": "text/event-stream"},
+                timeout=timeout,
+            ) as resp:
+                if resp.status >= 400:
+                    body = await resp.text()
+                    if resp.status in (401, 403):
+                        # idToken rejected; mint a new one before reconnecting
+                        self._fb_exp = 0
+                    raise aiohttp.ClientResponseError(
+                        resp.request_info,
+                        resp.history,
+                        status=resp.status,
+                        message=body,
+                        headers=resp.headers,
+                    )
 
-        datapoints = self._parse_datapoints_node(dp_node)
-        timer_info: dict[str, Any] = timer_node if isinstance(timer_node, dict) else {}
-        return datapoints, timer_info
\ No newline at end of file
+                event: str | None = None
+                async for line in resp.content:
+                    # Work on the raw line; only the small event name is decoded to str
+                    if line.startswith(b"event:"):
+                        event = line[6:].decode("utf-8").strip()
+                        continue
+                    if not line.startswith(b"data:"):
+                        continue
+
+                    if event in ("put", "patch"):
+                        msg = decode_json(line[5:])
+                        if isinstance(msg, dict):
+                            yield event, str(msg.get("path") or "/"), msg.get("data")
+                    elif event == "auth_revoked":
+                        # Token no longer valid; force a new identity on reconnect
+                        self._fb_exp = 0
+                        return
+                    elif event == "cancel":
+                        raise RuntimeError(
+                            f"RTDB stream cancelled by server: {line[5:].decode('utf-8', 'replace').strip()}"
+                        )
+                    # keep-alive: nothing to do
+        except asyncio.TimeoutError:
+            if time.time() >= rotate_at:
+                return
+            raise
+
+
+class PortaCoolApexDevice:
+    """One Apex unit on an account; what entities hold to identify and command their device."""
+
+    def __init__(self, api: PortaCoolApexAPI, info: dict[str, Any]) -> None:
+        self._api = api
+        self.device_id: str = str(info["unique_id"])
+        self.device_type_id: int = int(info["device_type_id"])
+        self.name: str = info.get("device_name") or "PortaCool Apex"
+        self.model: str = info.get("model") or "Apex"
+
+    def set_api(self, api: PortaCoolApexAPI) -> None:
+        """Send through another client (the entry moved to another account)."""
+        self._api = api
+
+    async def invoke(self, datapoint_id: int, value: str) -> None:
+        await self._api.invoke(self.device_id, self.device_type_id, datapoint_id, value)
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import time
+from collections.abc import Callable
+from typing import Any
+
 import aiohttp
 
 from .const import API_BASE, SIGNIN_ENDPOINT
+from .metrics import EndpointStats, error_key
 
 
 class PortaCoolApexAuth:
@@ -13,14 +18,31 @@ class PortaCoolApexAuth:
       - Legacy style expected by older api.py: is_expired(), refresh(), access_token
     """
 
-    def __init__(self, session: aiohttp.ClientSession, username: str, password: str):
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        username: str,
+        password: str,
+        *,
+        api_base: str = API_BASE,
+    ):
         self._session = session
+        # Only overridden to point at a stand-in (scripts/mock_cloud.py)
+        self._api_base = api_base.rstrip("/")
         self._username = username
         self._password = password
 
         self._access_token: str | None = None
         self._expires_at: float = 0
 
+        # In-flight signin shared by every concurrent caller (single-flight)
+        self._signin_task: asyncio.Future | None = None
+        # Signin request metrics (reported alongside the API's other endpoints)
+        self.request_stats = EndpointStats()
+
+        # Called after every successful signin (used to persist tokens across restarts)
+        self.on_tokens_updated: Callable[[], None] | None = None
+
     # ---------------------------------------------------------------------
     # New-style API (preferred)
     # ---------------------------------------------------------------------
@@ -54,16 +76,56 @@ class PortaCoolApexAuth:
         """
         await self._signin()
 
+    # ---------------------------------------------------------------------
+    # Persistence
+    # ---------------------------------------------------------------------
+    def export_tokens(self) -> dict[str, Any]:
+        return {"access_token": self._access_token, "expires_at": self._expires_at}
+
+    def restore_tokens(self, data: dict[str, Any] | None) -> None:
+        """Reuse a token saved by a previous run if it is still valid."""
+        if not isinstance(data, dict):
+            return
+        token = data.get("access_token")
+        try:
+            expires_at = float(data.get("expires_at") or 0)
+        except (TypeError, ValueError):
+            return
+        if isinstance(token, str) and token and time.time() < expires_at - 60:
+            self._access_token = token
+            self._expires_at = expires_at
+
     # ---------------------------------------------------------------------
     # Internal signin
     # ---------------------------------------------------------------------
     async def _signin(self) -> None:
-        url = f"{API_BASE}{SIGNIN_ENDPOINT}"
+        """Sign in once no matter how many coroutines ask at the same time.
+
+        Callers that arrive while a signin is running await the same task and share
+        its result (or its exception); the next call after it finishes starts a new one.
+        """
+        if self._signin_task is None or self._signin_task.done():
+            self._signin_task = asyncio.ensure_future(self._do_signin())
+        # shield: a cancelled waiter must not cancel the signin other callers are sharing
+        await asyncio.shield(self._signin_task)
+
+    async def _do_signin(self) -> None:
+        url = f"{self._api_base}{SIGNIN_ENDPOINT}"
         payload = {"username": self._username, "password": self._password}
 
-        async with self._session.post(url, json=payload) as resp:
-            resp.raise_for_status()
-            data = await resp.json()
+        started = time.monotonic()
+        try:
+            async with self._session.post(url, json=payload) as resp:
+                resp.raise_for_status()
+                body = await resp.read()
+                data = await resp.json()
+        except Exception as err:
+            self.request_stats.record(time.monotonic() - started, error=error_key(err))
+            raise
+        self.request_stats.record(time.monotonic() - started, size=len(body))
 
         self._access_token = data["access_token"]
-        self._expires_at = time.time() + data.get("expires_in", 3600)
\ No newline at end of file
+        self._expires_at = time.time() + data.get("expires_in", 3600)
+
+        if self.on_tokens_updated is not None:
+            self.on_tokens_updated()
\ No newline at end of file
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntity
+from homeassistant.const import EntityCategory
+
+from .const import DOMAIN
+from .coordinator import CONNECTIVITY_KEY
+from .entity import PortaCoolApexEntity
+
+
+class PortaCoolCloudConnectivitySensor(PortaCoolApexEntity, BinarySensorEntity):
+    """Off once the unit's cloud state has stopped changing (unplugged or offline).
+
+    RTDB keeps serving a dead unit's last values, so this is inferred by the hub from
+    reads that keep coming back unchanged while the unit reads as powered on.
+    """
+
+    _attr_name = "Cloud Connection"
+    _attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator, device, entry) -> None:
+        super().__init__(coordinator, device, entry)
+        self._attr_unique_id = f"{self._device.device_id}_cloud_connection"
+
+    def _listen_context(self) -> frozenset | None:
+        return frozenset({(self._device.device_id, CONNECTIVITY_KEY)})
+
+    @property
+    def is_on(self) -> bool:
+        return not self._hub.is_stale(self._device.device_id)
+
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    data = hass.data[DOMAIN][entry.entry_id]
+    hub = data["hub"]
+    coordinator = data["coordinator"]
+
+    entities = [
+        PortaCoolCloudConnectivitySensor(coordinator, device, entry)
+        for device in hub.devices.values()
+    ]
+
+    async_add_entities(entities)
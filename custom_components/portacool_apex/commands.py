@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from .api import PortaCoolApexDevice
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PortaCoolApexCommandQueue:
+    """Per-device write queue that coalesces rapid datapoint changes.
+
+    Writes arriving within `window` seconds of the first one are merged (last write
+    per datapoint wins) and sent together; every caller in that batch awaits the same
+    result. `on_flushed` runs once per batch, sent or failed, so the hub can issue a
+    single confirming refresh instead of one per click.
+    """
+
+    def __init__(
+        self,
+        device: PortaCoolApexDevice,
+        window: float,
+        on_flushed: Callable[[], Awaitable[None]],
+    ) -> None:
+        self._device = device
+        self._window = window
+        self._on_flushed = on_flushed
+
+        self._pending: dict[int, str] = {}
+        self._waiter: asyncio.Future | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        # Batches go out one at a time so an older batch can never land after a newer one
+        self._send_lock = asyncio.Lock()
+
+    async def async_send(self, updates: dict[int, str]) -> float:
+        """Queue `updates` and wait for their batch to be sent; returns when it started (time.time())."""
+        for dp_id, value in updates.items():
+            self._pending[int(dp_id)] = str(value)
+
+        if self._waiter is None:
+            loop = asyncio.get_running_loop()
+            self._waiter = loop.create_future()
+            self._timer = loop.call_later(self._window, self._start_flush)
+
+        # shield: one caller going away must not cancel the batch for the others
+        return await asyncio.shield(self._waiter)
+
+    def cancel(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.cancel()
+        self._waiter = None
+        self._pending = {}
+
+    def _start_flush(self) -> None:
+        self._timer = None
+        batch, self._pending = self._pending, {}
+        waiter, self._waiter = self._waiter, None
+        if waiter is None:
+            return
+        task = asyncio.get_running_loop().create_task(self._flush(batch, waiter))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, batch: dict[int, str], waiter: asyncio.Future) -> None:
+        async with self._send_lock:
+            started = time.time()
+            try:
+                for dp_id in sorted(batch):
+                    await self._device.invoke(dp_id, batch[dp_id])
+            except Exception as err:
+                if not waiter.done():
+                    waiter.set_exception(err)
+            else:
+                if not waiter.done():
+                    waiter.set_result(started)
+
+        try:
+            await self._on_flushed()
+        except Exception as err:
+            _LOGGER.debug("Refresh after commands for %s failed: %s", self._device.device_id, err)
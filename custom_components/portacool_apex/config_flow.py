@@ -10,6 +10,7 @@ from homeassistant.helpers import aiohttp_client
 from .const import DOMAIN
 from .auth import PortaCoolApexAuth
 from .api import PortaCoolApexAPI
+from .hub import claimed_device_ids, device_entry_data
 from .options_flow import PortaCoolApexOptionsFlowHandler
 
 
@@ -39,11 +40,13 @@ class PortaCoolApexConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         username = user_input[CONF_USERNAME]
         password = user_input[CONF_PASSWORD]
 
+        # One entry per account; the hub serves every unit on it
+        await self.async_set_unique_id(username.strip().lower())
+        self._abort_if_unique_id_configured()
+
         session = aiohttp_client.async_get_clientsession(self.hass)
         auth = PortaCoolApexAuth(session, username, password)
-
-        # Temporary API object for discovery (dummy IDs are fine)
-        api = PortaCoolApexAPI(session, auth, device_id="0-0", device_type_id=0)
+        api = PortaCoolApexAPI(session, auth)
 
         try:
             devices = await api.get_devices()
@@ -71,19 +74,28 @@ class PortaCoolApexConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 errors=errors,
             )
 
-        d = devices[0]
-        name = d.get("deviceName", "PortaCool APEX")
-        model = d.get("modelNumber")
-        title = f"{name} ({model})" if model else name
+        # Units already set up by older per-device entries stay with those entries
+        claimed = claimed_device_ids(self.hass)
+        units = [
+            device_entry_data(d)
+            for d in devices
+            if isinstance(d, dict) and d.get("uniqueId") and d["uniqueId"] not in claimed
+        ]
+        if not units:
+            return self.async_abort(reason="already_configured")
+
+        if len(units) == 1:
+            name = units[0].get("device_name") or "PortaCool APEX"
+            model = units[0].get("model")
+            title = f"{name} ({model})" if model else name
+        else:
+            title = f"PortaCool APEX ({len(units)} units)"
 
         return self.async_create_entry(
             title=title,
             data={
                 "username": username,
                 "password": password,
-                "unique_id": d["uniqueId"],
-                "device_type_id": d["deviceTypeId"],
-                "device_name": d.get("deviceName"),
-                "model": d.get("modelNumber"),
+                "devices": units,
             },
         )
\ No newline at end of file
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import logging
+import time
+from functools import partial
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .metrics import LatencySamples, latency_summary
+from .state import EMPTY_STATE, DeviceState
+from .ticker import PortaCoolApexTicker
+
+_LOGGER = logging.getLogger(__name__)
+
+# Listener context key for a device's timer node, alongside (device_id, dp_id) keys
+TIMER_KEY = "timer"
+# ... for its command confirmation statistics
+COMMANDS_KEY = "commands"
+# ... for whether the cloud still hears from it
+CONNECTIVITY_KEY = "connectivity"
+# ... and for the account's adaptive poll interval (same for every device)
+POLL_INTERVAL_KEY = "poll_interval"
+
+# A sent write stays visible for at most this long when no read confirms it (seconds)
+PENDING_WRITE_TIMEOUT_SECONDS = 15
+
+
+def changed_keys(old: Any, new: Any) -> set[tuple[str, Any]] | None:
+    """(device_id, dp_id | TIMER_KEY) keys that differ between two state snapshots.
+
+    None means "can't tell" (no usable baseline), i.e. treat everything as changed.
+    """
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return None
+
+    out: set[tuple[str, Any]] = set()
+    for device_id in old.keys() | new.keys():
+        old_dev = old.get(device_id) or EMPTY_STATE
+        new_dev = new.get(device_id) or EMPTY_STATE
+        if old_dev is new_dev:
+            continue
+
+        old_dps = old_dev.datapoints
+        new_dps = new_dev.datapoints
+        if old_dps is not new_dps:
+            for dp_id in old_dps.keys() | new_dps.keys():
+                if old_dps.get(dp_id) != new_dps.get(dp_id):
+                    out.add((device_id, dp_id))
+
+        if old_dev.timer_info != new_dev.timer_info:
+            out.add((device_id, TIMER_KEY))
+    return out
+
+
+class PortaCoolApexCoordinator(DataUpdateCoordinator[dict[str, DeviceState]]):
+    """State coordinator that only wakes the entities whose datapoints changed.
+
+    Listeners may register a frozenset of (device_id, dp_id | TIMER_KEY) keys as their
+    context; they are called only when one of those keys changed since the previous
+    notification. Listeners without a context are always called, as are all of them
+    when availability flips or on async_update_all_listeners().
+
+    It also holds the optimistic overlay: datapoint writes the user made that the cloud
+    has not reported back yet. Entities read device_state(), the polled state with those
+    writes applied. A write is dropped once a read shows its value, when sending it
+    failed, or PENDING_WRITE_TIMEOUT_SECONDS after it was sent. The time from sending
+    a write to a read showing it is recorded per device and datapoint.
+    """
+
+    def __init__(self, *args: Any, ticker: PortaCoolApexTicker, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._ticker = ticker
+        self._notified_data: Any = None
+        self._notified_success: bool | None = None
+        # device_id -> {dp_id: (value, sent_at)}; sent_at is None until the write went out
+        self._pending: dict[str, dict[int, tuple[str, float | None]]] = {}
+        # device_id -> (polled state, that state with the device's pending writes applied)
+        self._merged: dict[str, tuple[DeviceState, DeviceState]] = {}
+        # device_id -> {dp_id: send-to-confirmation latency / writes never confirmed}
+        self._confirm_latency: dict[str, dict[int, LatencySamples]] = {}
+        self._unconfirmed: dict[str, dict[int, int]] = {}
+        # device_id -> pending dp_ids the polled state already showed when they were written
+        # (an automation re-asserting a state); confirmed without a latency sample, counted
+        self._already_set_pending: dict[str, set[int]] = {}
+        self._already_set: dict[str, dict[int, int]] = {}
+
+    def device_state(self, device_id: str) -> DeviceState:
+        """A unit's polled state with its pending writes applied."""
+        data = self.data
+        state = data.get(device_id) if isinstance(data, dict) else None
+        if state is None:
+            state = EMPTY_STATE
+
+        pending = self._pending.get(device_id)
+        if not pending:
+            return state
+
+        merged = self._merged.get(device_id)
+        if merged is None or merged[0] is not state:
+            datapoints = dict(state.datapoints)
+            for dp_id, (value, _) in pending.items():
+                datapoints[dp_id] = value
+            merged = (state, DeviceState.build(datapoints, state.timer_info))
+            self._merged[device_id] = merged
+        return merged[1]
+
+    def command_stats(self, device_id: str) -> dict[str, Any]:
+        """Confirmation latency of a unit's writes, overall and per datapoint."""
+        latency = self._confirm_latency.get(device_id, {})
+        unconfirmed = self._unconfirmed.get(device_id, {})
+        already_set = self._already_set.get(device_id, {})
+        return {
+            **latency_summary(s for samples in latency.values() for s in samples.samples),
+            "unconfirmed": sum(unconfirmed.values()),
+            "already_set": sum(already_set.values()),
+            "datapoints": {
+                dp_id: {
+                    **(latency[dp_id].summary() if dp_id in latency else latency_summary(())),
+                    "unconfirmed": unconfirmed.get(dp_id, 0),
+                    "already_set": already_set.get(dp_id, 0),
+                }
+                for dp_id in sorted(latency.keys() | unconfirmed.keys() | already_set.keys())
+            },
+        }
+
+    @callback
+    def async_set_pending(self, device_id: str, updates: dict[int, str]) -> None:
+        """Show `updates` on the unit's entities until a read confirms them."""
+        pending = self._pending.setdefault(device_id, {})
+        already_set = self._already_set_pending.setdefault(device_id, set())
+        polled = self.data.get(device_id) if isinstance(self.data, dict) else None
+        for dp_id, value in updates.items():
+            pending[int(dp_id)] = (str(value), None)
+            if polled is not None and polled.datapoints.get(int(dp_id)) == str(value):
+                already_set.add(int(dp_id))
+            else:
+                already_set.discard(int(dp_id))
+        self._pending_changed(device_id)
+        self.async_notify_keys({(device_id, int(dp_id)) for dp_id in updates})
+
+    @callback
+    def async_mark_sent(
+        self, device_id: str, updates: dict[int, str], sent_at: float | None = None
+    ) -> None:
+        """Start the confirmation clock of writes that went out (unless overwritten since).
+
+        Writes the unit already reports are confirmed right away: the next read would
+        return the same data, which doesn't notify listeners, so nothing would confirm them.
+        Those it showed before they were even written add no latency sample.
+        """
+        pending = self._pending.get(device_id)
+        if not pending:
+            return
+        if sent_at is None:
+            sent_at = time.time()
+        for dp_id, value in updates.items():
+            current = pending.get(int(dp_id))
+            if current is not None and current == (str(value), None):
+                pending[int(dp_id)] = (current[0], sent_at)
+        data = self.data
+        state = data.get(device_id) if isinstance(data, dict) else None
+        if state is not None and self._confirm_device(device_id, state, time.time()):
+            self.async_notify_keys({(device_id, COMMANDS_KEY)})
+        else:
+            self._pending_changed(device_id)
+
+    @callback
+    def async_drop_pending(self, device_id: str, updates: dict[int, str]) -> None:
+        """Forget writes that failed to send, so the polled values show again."""
+        pending = self._pending.get(device_id)
+        if not pending:
+            return
+        dropped: set[tuple[str, Any]] = set()
+        for dp_id, value in updates.items():
+            current = pending.get(int(dp_id))
+            if current is not None and current[0] == str(value):
+                del pending[int(dp_id)]
+                dropped.add((device_id, int(dp_id)))
+        if dropped:
+            self._pending_changed(device_id)
+            self.async_notify_keys(dropped)
+
+    def _pending_changed(self, device_id: str) -> None:
+        self._merged.pop(device_id, None)
+        pending = self._pending.get(device_id)
+        if not pending:
+            self._pending.pop(device_id, None)
+        already_set = self._already_set_pending.get(device_id)
+        if already_set is not None:
+            already_set &= (pending or {}).keys()
+            if not already_set:
+                del self._already_set_pending[device_id]
+
+        sent = [sent_at for _, sent_at in (pending or {}).values() if sent_at is not None]
+        self._ticker.schedule(
+            ("pending", device_id),
+            min(sent) + PENDING_WRITE_TIMEOUT_SECONDS if sent else None,
+            partial(self._async_expire_pending, device_id),
+        )
+
+    @callback
+    def _async_expire_pending(self, device_id: str) -> None:
+        pending = self._pending.get(device_id)
+        if not pending:
+            return
+        cutoff = time.time() - PENDING_WRITE_TIMEOUT_SECONDS
+        expired = [
+            dp_id for dp_id, (_, sent_at) in pending.items() if sent_at is not None and sent_at <= cutoff
+        ]
+        unconfirmed = self._unconfirmed.setdefault(device_id, {})
+        for dp_id in expired:
+            _LOGGER.debug("%s: write to dp %s was not confirmed, showing the polled value", device_id, dp_id)
+            del pending[dp_id]
+            unconfirmed[dp_id] = unconfirmed.get(dp_id, 0) + 1
+        self._pending_changed(device_id)
+        if expired:
+            self.async_notify_keys(
+                {(device_id, dp_id) for dp_id in expired} | {(device_id, COMMANDS_KEY)}
+            )
+
+    def _confirm_pending(self) -> set[tuple[str, Any]]:
+        """Drop the sent writes the latest data now shows (the merged view doesn't change).
+
+        Returns the COMMANDS_KEY keys of the units whose latency statistics moved.
+        """
+        data = self.data
+        if not self._pending or not isinstance(data, dict):
+            return set()
+        now = time.time()
+        out: set[tuple[str, Any]] = set()
+        for device_id in list(self._pending):
+            state = data.get(device_id)
+            if state is not None and self._confirm_device(device_id, state, now):
+                out.add((device_id, COMMANDS_KEY))
+        return out
+
+    def _confirm_device(self, device_id: str, state: DeviceState, now: float) -> bool:
+        """Drop the unit's sent writes that `state` shows, recording their latency (or
+        counting them as already set)."""
+        pending = self._pending.get(device_id, {})
+        confirmed = [
+            dp_id
+            for dp_id, (value, sent_at) in pending.items()
+            if sent_at is not None and state.datapoints.get(dp_id) == value
+        ]
+        if not confirmed:
+            return False
+        latency = self._confirm_latency.setdefault(device_id, {})
+        already_set = self._already_set_pending.get(device_id, set())
+        for dp_id in confirmed:
+            _, sent_at = pending.pop(dp_id)
+            if dp_id in already_set:
+                counts = self._already_set.setdefault(device_id, {})
+                counts[dp_id] = counts.get(dp_id, 0) + 1
+            else:
+                latency.setdefault(dp_id, LatencySamples()).add(now - sent_at)
+        self._pending_changed(device_id)
+        return True
+
+    @callback
+    def async_update_all_listeners(self) -> None:
+        self._notified_data = None
+        self.async_update_listeners()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        confirmed = self._confirm_pending()
+
+        changed: set[tuple[str, Any]] | None = None
+        if self._notified_success == self.last_update_success:
+            changed = changed_keys(self._notified_data, self.data)
+            if changed is not None:
+                changed |= confirmed
+        self._notified_data = self.data
+        self._notified_success = self.last_update_success
+        self.async_notify_keys(changed)
+
+    @callback
+    def async_notify_keys(self, changed: set[tuple[str, Any]] | None) -> None:
+        """Call the listeners watching any of `changed` (all of them for None)."""
+        for update_callback, context in list(self._listeners.values()):
+            if changed is None or context is None or not changed.isdisjoint(context):
+                update_callback()
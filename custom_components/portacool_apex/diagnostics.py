@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import hashlib
+import time
 from typing import Any
 
+from homeassistant.components.diagnostics import REDACTED, async_redact_data
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers import redact_data
 
+from .alerts import AlertIndex
 from .const import DOMAIN
+from .coordinator import PENDING_WRITE_TIMEOUT_SECONDS
+from .hub import entry_devices
+from .state import DeviceState
 
 # Redact any sensitive config entry fields and anything token-like
 REDACT_KEYS = {
@@ -19,6 +25,7 @@ REDACT_KEYS = {
     "auth",
     "authorization",
     "firebase_web_api_key",  # not secret, but keep it out of diagnostics by default
+    "devices",  # listed (masked, with their key) under "devices" instead
 }
 
 
@@ -30,48 +37,53 @@ def _mask(s: Any, keep: int = 6) -> str | None:
     return f"{s[:keep]}…"
 
 
-def _safe_coordinator_snapshot(data: Any) -> dict[str, Any]:
+def _device_key(device_id: str) -> str:
+    """Short, stable key of a unit for per-unit sections.
+
+    Units on one account share a serial prefix, so masked ids would collide.
+    """
+    return hashlib.sha256(device_id.encode()).hexdigest()[:8]
+
+
+def _safe_title(entry: ConfigEntry) -> str:
+    """Entry title, unless it carries the login (account entries were once titled with it)."""
+    username = entry.data.get("username")
+    if isinstance(username, str) and username and username.lower() in entry.title.lower():
+        return REDACTED
+    return entry.title
+
+
+def _safe_device_snapshot(data: Any, alerts: AlertIndex | None = None) -> dict[str, Any]:
     """
-    Return a safe-to-share snapshot of coordinator data.
+    Return a safe-to-share snapshot of one device's coordinator data.
     - Includes datapoints (as-is) because they are device telemetry, not credentials.
-    - Includes timer_info and alerts, but prunes/keeps only what’s useful.
+    - Includes timer_info and the device's alerts (polled separately), but prunes/keeps only what’s useful.
     """
-    if not isinstance(data, dict):
+    if not isinstance(data, DeviceState):
         return {"data_type": str(type(data))}
 
-    datapoints = data.get("datapoints")
-    timer_info = data.get("timer_info")
-    alerts = data.get("alerts")
-
     # Alerts can be large; keep only active + a small sample of inactive
     safe_alerts: list[dict[str, Any]] = []
-    if isinstance(alerts, list):
-        active = []
-        inactive = []
-        for a in alerts:
-            if not isinstance(a, dict):
-                continue
-            try:
-                is_active = int(a.get("value", 1)) != 1
-            except Exception:
-                is_active = False
-            (active if is_active else inactive).append(
-                {
-                    "alertId": a.get("alertId"),
-                    "alertName": a.get("alertName"),
-                    "alertType": a.get("alertType"),
-                    "value": a.get("value"),
-                    "timestamp": a.get("timestamp"),
-                }
-            )
-
-        safe_alerts = active + inactive[:5]
+    if isinstance(alerts, AlertIndex):
+        active_ids = {id(a) for a in alerts.active}
+        inactive = [a for a in alerts.alerts if isinstance(a, dict) and id(a) not in active_ids]
+        safe_alerts = [
+            {
+                "alertId": a.get("alertId"),
+                "alertName": a.get("alertName"),
+                "alertType": a.get("alertType"),
+                "value": a.get("value"),
+                "timestamp": a.get("timestamp"),
+            }
+            for a in alerts.active + inactive[:5]
+        ]
 
     return {
-        "datapoints": datapoints if isinstance(datapoints, dict) else None,
-        "timer_info": timer_info if isinstance(timer_info, dict) else None,
+        "datapoints": data.datapoints,
+        "timer_info": data.timer_info,
+        "alerts_severity": alerts.severity if isinstance(alerts, AlertIndex) else None,
         "alerts_sample": safe_alerts,
-        "alerts_total": len(alerts) if isinstance(alerts, list) else None,
+        "alerts_total": len(alerts.alerts) if isinstance(alerts, AlertIndex) else None,
     }
 
 
@@ -84,36 +96,83 @@ async def async_get_config_entry_diagnostics(
     store = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
     coordinator = store.get("coordinator")
 
-    # You store device unique id in entry.data["unique_id"]
-    unique_id = entry.data.get("unique_id")
-    device_type_id = entry.data.get("device_type_id")
-
     diag: dict[str, Any] = {
         "integration": DOMAIN,
         "entry": {
             "entry_id": entry.entry_id,
-            "title": entry.title,
+            "title": _safe_title(entry),
             "domain": entry.domain,
             "version": entry.version,
         },
-        "device": {
-            "device_name": entry.data.get("device_name"),
-            "model": entry.data.get("model"),
-            "unique_id": _mask(unique_id),
-            "device_type_id": device_type_id,
-        },
-        "options": redact_data(dict(entry.options), REDACT_KEYS),
-        "config_entry_data": redact_data(dict(entry.data), REDACT_KEYS),
+        "devices": [
+            {
+                "device_name": d.get("device_name"),
+                "model": d.get("model"),
+                "unique_id": _mask(d.get("unique_id")),
+                "key": _device_key(d["unique_id"]) if isinstance(d.get("unique_id"), str) else None,
+                "device_type_id": d.get("device_type_id"),
+            }
+            for d in entry_devices(entry)
+        ],
+        "options": async_redact_data(dict(entry.options), REDACT_KEYS),
+        "config_entry_data": async_redact_data(dict(entry.data), REDACT_KEYS),
     }
 
+    hub = store.get("hub")
+    if hub is not None:
+        diag["polling"] = {
+            "configured_seconds": hub.poll_interval_seconds,
+            "effective_seconds": hub.effective_poll_seconds,
+            "alerts_seconds": hub.alerts_interval_seconds,
+            "alerts_last_update_success": hub.alerts_coordinator.last_update_success,
+            "stale_devices": {
+                _device_key(device_id): cache["stale_backoff"]
+                for device_id, cache in hub.state_cache.items()
+                if cache["stale_backoff"]
+            },
+            # Seconds since each streamed unit's last stream event
+            "stream_event_age_seconds": {
+                _device_key(device_id): round(time.time() - cache["last_stream_event"], 1)
+                for device_id, cache in hub.state_cache.items()
+                if cache["last_stream_event"]
+            },
+            # Units still showing the state restored at startup
+            "restored_devices": sorted(_device_key(device_id) for device_id in hub.restored_devices),
+        }
+
+        diag["commands"] = {
+            "pending_write_timeout_seconds": PENDING_WRITE_TIMEOUT_SECONDS,
+            "confirmation_latency": {
+                _device_key(device_id): hub.coordinator.command_stats(device_id)
+                for device_id in hub.devices
+            },
+        }
+
+    api = store.get("api")
+    if api is not None:
+        diag["cloud"] = {
+            "circuit_breakers": api.resilience_state(),
+            "rtdb_reads": dict(api.rtdb_stats),
+            "requests": api.request_stats(),
+        }
+
     if coordinator is not None:
         try:
+            data = getattr(coordinator, "data", None)
+            alerts = hub.alerts_coordinator.data if hub is not None else None
+            if not isinstance(alerts, dict):
+                alerts = {}
             diag["coordinator"] = {
                 "last_update_success": getattr(coordinator, "last_update_success", None),
                 "last_exception": str(getattr(coordinator, "last_exception", None))
                 if getattr(coordinator, "last_exception", None)
                 else None,
-                "data_snapshot": _safe_coordinator_snapshot(getattr(coordinator, "data", None)),
+                "data_snapshot": {
+                    _device_key(device_id): _safe_device_snapshot(device_data, alerts.get(device_id))
+                    for device_id, device_data in data.items()
+                }
+                if isinstance(data, dict)
+                else {"data_type": str(type(data))},
             }
         except Exception as err:
             diag["coordinator"] = {"error": str(err)}
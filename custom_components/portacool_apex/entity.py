@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .alerts import EMPTY_ALERTS, AlertIndex
+from .api import PortaCoolApexDevice
+from .const import DOMAIN
+from .coordinator import CONNECTIVITY_KEY, TIMER_KEY, PortaCoolApexCoordinator
+from .state import DeviceState
+
+# Set while the unit still shows the state restored at startup
+ATTR_RESTORED = "restored"
+
+
+class PortaCoolApexEntity(CoordinatorEntity):
+    """Base for entities of one Apex unit served by the account hub coordinator."""
+
+    _attr_has_entity_name = True
+    # Entities reading alerts on top of datapoints also follow the alerts coordinator
+    _follows_alerts = False
+    # What this entity renders from the state coordinator; it is only woken when one of
+    # these changes. Leave both unset to be notified on every update.
+    _watched_datapoints: tuple[int, ...] = ()
+    _watches_timer = False
+
+    def __init__(self, coordinator, device: PortaCoolApexDevice, entry) -> None:
+        super().__init__(coordinator)
+        self._device = device
+        self._entry = entry
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._device.device_id)},
+            manufacturer="PortaCool",
+            model=self._device.model,
+            name=self._device.name,
+        )
+
+    async def async_added_to_hass(self) -> None:
+        if isinstance(self.coordinator, PortaCoolApexCoordinator):
+            self.coordinator_context = self._listen_context()
+        await super().async_added_to_hass()
+        if self._follows_alerts and self.coordinator is not self._hub.alerts_coordinator:
+            self.async_on_remove(
+                self._hub.alerts_coordinator.async_add_listener(self._handle_coordinator_update)
+            )
+
+    def _listen_context(self) -> frozenset | None:
+        device_id = self._device.device_id
+        keys = {(device_id, dp_id) for dp_id in self._watched_datapoints}
+        if self._watches_timer:
+            keys.add((device_id, TIMER_KEY))
+        if not keys:
+            return None
+        # Also woken when the unit goes live or stale, for the restored attribute
+        keys.add((device_id, CONNECTIVITY_KEY))
+        return frozenset(keys)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        attrs = self._extra_attributes()
+        if self._device.device_id in self._hub.restored_devices:
+            attrs = {**(attrs or {}), ATTR_RESTORED: True}
+        return attrs
+
+    def _extra_attributes(self) -> dict[str, Any] | None:
+        """Entity specific attributes; the base adds `restored` while that applies."""
+        return None
+
+    @property
+    def _hub(self):
+        return self.hass.data[DOMAIN][self._entry.entry_id]["hub"]
+
+    def _state(self) -> DeviceState:
+        """This unit's state, including writes the cloud has not confirmed yet."""
+        return self.coordinator.device_state(self._device.device_id)
+
+    def _get_dp(self, dp_id: int) -> str | None:
+        value = self._state().datapoints.get(dp_id)
+        return str(value) if value is not None else None
+
+    def _alert_index(self) -> AlertIndex:
+        data = self._hub.alerts_coordinator.data
+        index = data.get(self._device.device_id) if isinstance(data, dict) else None
+        return index if index is not None else EMPTY_ALERTS
+
+    def _timer_info(self) -> dict[str, Any]:
+        return self._state().timer_info
+
+    async def _async_send_commands(self, updates: dict[int, str]) -> None:
+        """Show `updates` right away, then hand them to the device's coalescing command queue.
+
+        Returns once the batch containing them has been sent (or raises if it failed).
+        They stay in the coordinator's overlay until a read confirms them; a failed send
+        drops them right away.
+        """
+        device_id = self._device.device_id
+        self.coordinator.async_set_pending(device_id, updates)
+        sent_at: float | None = None
+        try:
+            sent_at = await self._hub.commands[device_id].async_send(updates)
+        except Exception:
+            self.coordinator.async_drop_pending(device_id, updates)
+            raise
+        finally:
+            # No-op for dropped writes; otherwise the confirmation clock starts
+            self.coordinator.async_mark_sent(device_id, updates, sent_at)
@@ -0,0 +1,879 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import timedelta
+from functools import partial
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import aiohttp_client
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .alerts import AlertIndex
+from .api import PortaCoolApexAPI, PortaCoolApexDevice
+from .auth import PortaCoolApexAuth
+from .commands import PortaCoolApexCommandQueue
+from .coordinator import CONNECTIVITY_KEY, POLL_INTERVAL_KEY, PortaCoolApexCoordinator
+from .const import (
+    API_BASE,
+    COMMAND_COALESCE_SECONDS,
+    CONF_FIREBASE_WEB_API_KEY,
+    CONF_SERVICE_URLS,
+    DEFAULT_ALERTS_INTERVAL_SECONDS,
+    DEFAULT_OFFLINE_REFRESH_SECONDS,
+    DEFAULT_POLL_INTERVAL_SECONDS,
+    DEFAULT_STREAM_MODE,
+    DEFAULT_TIMER_RESOLUTION_SECONDS,
+    DOMAIN,
+    DP_FAN_FEEDBACK,
+    DP_FAN_SPEED,
+    DP_POWER,
+    DP_PUMP_ENABLE,
+    DP_PUMP_MODE,
+    DP_PUMP_SPEED,
+    DP_TIMER,
+    DP_WATER_LEVEL,
+    OPTIONS_ALERTS_INTERVAL_SECONDS,
+    OPTIONS_OFFLINE_REFRESH_SECONDS,
+    OPTIONS_POLL_INTERVAL_SECONDS,
+    OPTIONS_STREAM_MODE,
+    OPTIONS_TIMER_RESOLUTION_SECONDS,
+)
+from .state import EMPTY_STATE, DeviceState
+from .stream import PortaCoolApexStream
+from .ticker import PortaCoolApexTicker
+
+_LOGGER = logging.getLogger(__name__)
+
+# After a command, force real network refresh for this long (seconds)
+FORCE_REFRESH_SECONDS = 15
+
+# Adaptive polling: poll at most this often while something is happening on a unit
+# (a command just went out, the fan is ramping, a sleep timer is about to expire) ...
+ACTIVE_POLL_SECONDS = 3
+ACTIVE_WINDOW_SECONDS = 20
+TIMER_EXPIRY_WINDOW_SECONDS = 60
+# ... and back off to STABLE_POLL_FACTOR x the configured interval (capped) once no
+# unit has changed for STABLE_AFTER_SECONDS
+STABLE_AFTER_SECONDS = 300
+STABLE_POLL_FACTOR = 4
+STABLE_POLL_MAX_SECONDS = 60
+
+# Datapoints whose changes count as activity; temperatures and humidity drift on their
+# own and would keep a steady unit from ever being considered stable
+ACTIVITY_DATAPOINTS = (
+    DP_POWER,
+    DP_FAN_SPEED,
+    DP_PUMP_SPEED,
+    DP_PUMP_MODE,
+    DP_PUMP_ENABLE,
+    DP_TIMER,
+    DP_WATER_LEVEL,
+)
+# Measured airflow (DP7) jitters on every read of a running unit; only a move of at
+# least this much from where it last settled counts as the fan ramping
+FAN_RAMP_THRESHOLD = 200
+
+# A unit that reads as powered on but whose RTDB node has not changed for
+# STALE_AFTER_READS reads spanning STALE_AFTER_SECONDS is cloud-stale: unplugged or
+# offline, with RTDB serving its last values. Its reads then back off, doubling from
+# STALE_POLL_MIN_SECONDS up to STALE_POLL_MAX_SECONDS, until the node moves again.
+# A streamed unit is never read, so it goes stale after STALE_AFTER_SECONDS without
+# a stream event that changed its node.
+STALE_AFTER_READS = 10
+STALE_AFTER_SECONDS = 600
+STALE_POLL_MIN_SECONDS = 60
+STALE_POLL_MAX_SECONDS = 900
+
+# A change in any of these triggers an immediate alerts refresh (the tank alerts
+# follow the water level)
+ALERT_TRIGGER_DATAPOINTS = (DP_WATER_LEVEL,)
+
+# hass.data key for auth/API clients shared by every entry of the same account
+DATA_ACCOUNTS = f"{DOMAIN}_accounts"
+
+# Persisted REST token + Firebase identity, one store per account
+TOKEN_STORAGE_VERSION = 1
+TOKEN_SAVE_DELAY_SECONDS = 5
+
+# Last known state and alerts, one store per entry; restored at setup so entities have
+# values before the cloud answers. Saved at most this often while things change (a
+# pending save is flushed on unload and at shutdown), to spare SD cards.
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY_SECONDS = 15 * 60
+# Older snapshots are ignored; setup waits for the cloud instead
+SNAPSHOT_MAX_AGE_SECONDS = 6 * 3600
+
+
+def device_entry_data(item: dict[str, Any]) -> dict[str, Any]:
+    """Map a devices/my item to what we keep per device in the config entry."""
+    return {
+        "unique_id": item["uniqueId"],
+        "device_type_id": item["deviceTypeId"],
+        "device_name": item.get("deviceName"),
+        "model": item.get("modelNumber"),
+    }
+
+
+def entry_devices(entry: ConfigEntry) -> list[dict[str, Any]]:
+    """Devices served by an entry.
+
+    Account entries keep a `devices` list; entries created before the hub existed
+    describe exactly one unit at the top level of their data.
+    """
+    devices = entry.data.get("devices")
+    if isinstance(devices, list):
+        return [d for d in devices if isinstance(d, dict) and d.get("unique_id")]
+    if entry.data.get("unique_id"):
+        return [
+            {
+                "unique_id": entry.data["unique_id"],
+                "device_type_id": entry.data.get("device_type_id", 0),
+                "device_name": entry.data.get("device_name"),
+                "model": entry.data.get("model"),
+            }
+        ]
+    return []
+
+
+def _power_is_off(state: DeviceState | None) -> bool:
+    return state is not None and state.power_off
+
+
+def _activity_signature(datapoints: dict[int, str]) -> tuple[str | None, ...]:
+    return tuple(datapoints.get(dp_id) for dp_id in ACTIVITY_DATAPOINTS)
+
+
+def _fan_feedback(datapoints: dict[int, str]) -> float | None:
+    try:
+        return float(datapoints[DP_FAN_FEEDBACK])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _token_store(hass: HomeAssistant, username: str) -> Store:
+    # Hash the login so the account email doesn't end up in a .storage file name
+    digest = hashlib.sha256(username.strip().lower().encode("utf-8")).hexdigest()[:16]
+    return Store(hass, TOKEN_STORAGE_VERSION, f"{DOMAIN}.tokens.{digest}", private=True)
+
+
+def _seconds_or_none(seconds: int) -> float | None:
+    return float(seconds) if seconds > 0 else None
+
+
+def _interval_or_none(seconds: int) -> timedelta | None:
+    """Coordinator update_interval for an interval option (0 or less: polling disabled)."""
+    return timedelta(seconds=seconds) if seconds > 0 else None
+
+
+def _account_key(entry: ConfigEntry) -> tuple:
+    service_urls: dict[str, str] = entry.data.get(CONF_SERVICE_URLS) or {}
+    return (
+        entry.data["username"].strip().lower(),
+        entry.data["password"],
+        entry.options.get(CONF_FIREBASE_WEB_API_KEY) or "",
+        service_urls.get("api_base", ""),
+    )
+
+
+def _snapshot_store(hass: HomeAssistant, entry_id: str) -> Store:
+    return Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.state.{entry_id}")
+
+
+async def _async_acquire_account(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> tuple[PortaCoolApexAuth, PortaCoolApexAPI]:
+    """Return the auth/API pair for this entry's account, creating it on first use.
+
+    Entries for the same login (e.g. older per-device entries) share one REST token and
+    one Firebase identity, so a restart costs one signin per account, not per entry.
+    Tokens from the previous run are restored while still valid, so a cold start can
+    go straight to reading state.
+    """
+    firebase_key = entry.options.get(CONF_FIREBASE_WEB_API_KEY)
+    service_urls: dict[str, str] = entry.data.get(CONF_SERVICE_URLS) or {}
+    key = _account_key(entry)
+
+    accounts: dict[tuple, dict[str, Any]] = hass.data.setdefault(DATA_ACCOUNTS, {})
+    account = accounts.get(key)
+    if account is None:
+        store = _token_store(hass, entry.data["username"])
+        saved = await store.async_load()
+        # Another entry of the same account may have finished setting up meanwhile
+        account = accounts.get(key)
+
+    if account is None:
+        session = aiohttp_client.async_get_clientsession(hass)
+        auth = PortaCoolApexAuth(
+            session=session,
+            username=entry.data["username"],
+            password=entry.data["password"],
+            api_base=service_urls.get("api_base", API_BASE),
+        )
+        api = PortaCoolApexAPI(
+            session=session,
+            auth=auth,
+            firebase_web_api_key=firebase_key,
+            **service_urls,
+        )
+        if isinstance(saved, dict):
+            auth.restore_tokens(saved.get("auth"))
+            api.restore_identity(saved.get("firebase"))
+
+        def _save_tokens() -> None:
+            store.async_delay_save(
+                lambda: {"auth": auth.export_tokens(), "firebase": api.export_identity()},
+                TOKEN_SAVE_DELAY_SECONDS,
+            )
+
+        auth.on_tokens_updated = _save_tokens
+        api.on_identity_updated = _save_tokens
+
+        account = {"auth": auth, "api": api, "entry_ids": set()}
+        accounts[key] = account
+
+    account["entry_ids"].add(entry.entry_id)
+    return account["auth"], account["api"]
+
+
+def _async_rekey_account(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """File the entry's account under the key its options now give (Firebase key changed).
+
+    Only done when the entry is the account's sole user and no account has that key yet;
+    otherwise returns False and the entry has to move to the account for the new key.
+    """
+    accounts: dict[tuple, dict[str, Any]] = hass.data.get(DATA_ACCOUNTS, {})
+    new_key = _account_key(entry)
+    if new_key in accounts:
+        return False
+    for key, account in list(accounts.items()):
+        if entry.entry_id in account["entry_ids"]:
+            if account["entry_ids"] != {entry.entry_id}:
+                return False
+            accounts[new_key] = accounts.pop(key)
+            return True
+    return False
+
+
+def _async_release_account(hass: HomeAssistant, entry_id: str) -> None:
+    accounts: dict[tuple, dict[str, Any]] = hass.data.get(DATA_ACCOUNTS, {})
+    for key, account in list(accounts.items()):
+        account["entry_ids"].discard(entry_id)
+        if not account["entry_ids"]:
+            accounts.pop(key)
+
+
+async def async_remove_account_tokens(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop persisted tokens once no remaining entry uses this login."""
+    username = entry.data.get("username")
+    if not isinstance(username, str):
+        return
+    login = username.strip().lower()
+    for other in hass.config_entries.async_entries(DOMAIN):
+        if other.entry_id == entry.entry_id:
+            continue
+        if str(other.data.get("username", "")).strip().lower() == login:
+            return
+    await _token_store(hass, username).async_remove()
+
+
+async def async_remove_snapshot(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await _snapshot_store(hass, entry.entry_id).async_remove()
+
+
+class PortaCoolApexHub:
+    """One PortaCool account: a single login, Firebase identity and coordinators for all its units.
+
+    Both coordinators are keyed by device unique id:
+        coordinator:        {unique_id: DeviceState}
+        alerts_coordinator: {unique_id: AlertIndex}
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        self.hass = hass
+        self.entry = entry
+
+        self.auth: PortaCoolApexAuth | None = None
+        self.api: PortaCoolApexAPI | None = None
+        self.devices: dict[str, PortaCoolApexDevice] = {}
+
+        self._read_options()
+
+        # Wakes time-dependent entities (countdowns, airflow off clamp) when they change
+        self.ticker = PortaCoolApexTicker(hass)
+
+        self.state_cache: dict[str, dict[str, float]] = {}
+        # Activity datapoints seen on the last read, per device (adaptive polling)
+        self._signatures: dict[str, tuple[str | None, ...]] = {}
+        # Fan feedback (DP7) when the fan last moved by FAN_RAMP_THRESHOLD, per device
+        self._fan_settled: dict[str, float] = {}
+        # Interval the coordinator is currently polling at (None: polling disabled)
+        self.effective_poll_seconds: float | None = _seconds_or_none(self.poll_interval_seconds)
+        self.commands: dict[str, PortaCoolApexCommandQueue] = {}
+        self._streams: dict[str, PortaCoolApexStream] = {}
+        self._snapshot_store = _snapshot_store(hass, entry.entry_id)
+        # Set while a snapshot save is scheduled
+        self._snapshot_due = False
+        # Units showing restored state that no live read has replaced yet
+        self.restored_devices: set[str] = set()
+
+        self.coordinator = PortaCoolApexCoordinator(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_{entry.entry_id}_state",
+            update_method=self._async_update_data,
+            update_interval=_interval_or_none(self.poll_interval_seconds),
+            always_update=False,
+            ticker=self.ticker,
+        )
+        # Alerts change far less often than telemetry and are polled on their own cadence:
+        # {unique_id: AlertIndex}
+        self.alerts_coordinator: DataUpdateCoordinator[dict[str, AlertIndex]] = DataUpdateCoordinator(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_{entry.entry_id}_alerts",
+            update_method=self._async_update_alerts,
+            update_interval=_interval_or_none(self.alerts_interval_seconds),
+            always_update=False,
+        )
+
+    def _read_options(self) -> None:
+        options = self.entry.options
+        self.firebase_web_api_key: str | None = options.get(CONF_FIREBASE_WEB_API_KEY)
+        self.poll_interval_seconds = int(
+            options.get(OPTIONS_POLL_INTERVAL_SECONDS, DEFAULT_POLL_INTERVAL_SECONDS)
+        )
+        self.offline_refresh_seconds = int(
+            options.get(OPTIONS_OFFLINE_REFRESH_SECONDS, DEFAULT_OFFLINE_REFRESH_SECONDS)
+        )
+        self.stream_mode = bool(options.get(OPTIONS_STREAM_MODE, DEFAULT_STREAM_MODE))
+        self.alerts_interval_seconds = int(
+            options.get(OPTIONS_ALERTS_INTERVAL_SECONDS, DEFAULT_ALERTS_INTERVAL_SECONDS)
+        )
+        # Step of the timer countdown sensors, in seconds
+        self.timer_resolution_seconds = max(
+            1, int(options.get(OPTIONS_TIMER_RESOLUTION_SECONDS, DEFAULT_TIMER_RESOLUTION_SECONDS))
+        )
+
+    async def async_apply_options(self) -> None:
+        """Apply changed options in place, keeping tokens, the Firebase identity and state."""
+        firebase_key = self.firebase_web_api_key
+        poll = self.poll_interval_seconds
+        alerts = self.alerts_interval_seconds
+        stream_mode = self.stream_mode
+        resolution = self.timer_resolution_seconds
+        self._read_options()
+
+        if self.firebase_web_api_key != firebase_key:
+            if _async_rekey_account(self.hass, self.entry):
+                self.api.set_firebase_web_api_key(self.firebase_web_api_key)
+            else:
+                # Other entries still use the old key (or one already uses the new key):
+                # leave the shared client alone and move over
+                await self._async_move_account()
+
+        if self.stream_mode != stream_mode:
+            if self.stream_mode:
+                self._start_streams()
+            else:
+                # Polling takes the units back over, starting right away
+                await self._async_stop_streams()
+                await self.coordinator.async_request_refresh()
+
+        if self.alerts_interval_seconds != alerts:
+            self.alerts_coordinator.update_interval = _interval_or_none(self.alerts_interval_seconds)
+            # Refreshing reschedules the next poll on the new interval
+            await self.alerts_coordinator.async_request_refresh()
+
+        if self.poll_interval_seconds != poll:
+            self.effective_poll_seconds = _seconds_or_none(self.poll_interval_seconds)
+            self.coordinator.update_interval = _interval_or_none(self.poll_interval_seconds)
+            await self.coordinator.async_request_refresh()
+
+        if self.poll_interval_seconds != poll or self.timer_resolution_seconds != resolution:
+            # Countdowns re-step and the Power switch shows the new interval
+            self.coordinator.async_update_all_listeners()
+
+    async def _async_move_account(self) -> None:
+        """Switch to the auth/API pair filed under the entry's current account key."""
+        _async_release_account(self.hass, self.entry.entry_id)
+        self.auth, self.api = await _async_acquire_account(self.hass, self.entry)
+        for device in self.devices.values():
+            device.set_api(self.api)
+        store = self.hass.data.get(DOMAIN, {}).get(self.entry.entry_id)
+        if store is not None:
+            store["api"] = self.api
+        if self._streams:
+            await self._async_stop_streams()
+            self._start_streams()
+
+    async def async_setup(self) -> None:
+        self.auth, self.api = await _async_acquire_account(self.hass, self.entry)
+        self.devices = {
+            d["unique_id"]: PortaCoolApexDevice(self.api, d) for d in entry_devices(self.entry)
+        }
+        self.state_cache = {
+            device_id: {
+                "last_network_fetch": 0.0,
+                # when set in the future, we bypass offline cache even if power looks off
+                "force_refresh_until": 0.0,
+                # last time an activity datapoint changed; start out as "recently"
+                "last_activity": time.time(),
+                # last time the RTDB node changed, and reads since then (staleness)
+                "last_change": time.time(),
+                "unchanged_reads": 0,
+                # last event from the unit's RTDB stream (0 until one arrives)
+                "last_stream_event": 0.0,
+                # seconds between reads while cloud-stale; 0 while the unit is live
+                "stale_backoff": 0.0,
+            }
+            for device_id in self.devices
+        }
+        self.commands = {
+            device_id: PortaCoolApexCommandQueue(
+                device,
+                COMMAND_COALESCE_SECONDS,
+                partial(self._async_commands_flushed, device_id),
+            )
+            for device_id, device in self.devices.items()
+        }
+
+        if await self._async_restore_snapshot():
+            # Entities start from the snapshot; setup doesn't wait for the cloud
+            for coordinator in (self.coordinator, self.alerts_coordinator):
+                self.entry.async_create_background_task(
+                    self.hass,
+                    coordinator.async_refresh(),
+                    f"{coordinator.name}_first_refresh",
+                )
+        else:
+            try:
+                await asyncio.gather(
+                    self.coordinator.async_config_entry_first_refresh(),
+                    self.alerts_coordinator.async_config_entry_first_refresh(),
+                )
+            except Exception:
+                _async_release_account(self.hass, self.entry.entry_id)
+                raise
+
+        if self.stream_mode:
+            self._start_streams()
+
+    @callback
+    def async_start_discovery(self) -> None:
+        """Look for units added to or removed from the account, once platforms are set up."""
+        if "devices" in self.entry.data:
+            self.entry.async_create_background_task(
+                self.hass,
+                self._async_discover_devices(),
+                f"{DOMAIN}_{self.entry.entry_id}_discover",
+            )
+
+    async def async_unload(self) -> None:
+        if self._snapshot_due:
+            await self._snapshot_store.async_save(self._snapshot())
+        self.ticker.shutdown()
+        for queue in self.commands.values():
+            queue.cancel()
+        await self._async_stop_streams()
+        _async_release_account(self.hass, self.entry.entry_id)
+
+    def _start_streams(self) -> None:
+        for device_id in self.devices:
+            stream = PortaCoolApexStream(self.hass, self.api, device_id, self._async_stream_update)
+            self._streams[device_id] = stream
+            stream.async_start(self.entry)
+
+    async def _async_stop_streams(self) -> None:
+        streams, self._streams = self._streams, {}
+        for device_id, stream in streams.items():
+            self.ticker.cancel(("stream_quiet", device_id))
+            await stream.async_stop()
+
+    def force_refresh_window(self, device_id: str) -> None:
+        """Bypass the offline throttle for a device for a while (after a command)."""
+        cache = self.state_cache.get(device_id)
+        if cache is not None:
+            cache["force_refresh_until"] = time.time() + FORCE_REFRESH_SECONDS
+
+    async def _async_commands_flushed(self, device_id: str) -> None:
+        """One confirming refresh per command batch, bypassing the offline throttle."""
+        self.force_refresh_window(device_id)
+        await self.coordinator.async_request_refresh()
+
+    def is_stale(self, device_id: str) -> bool:
+        """True while a unit's cloud state has stopped changing (likely offline)."""
+        cache = self.state_cache.get(device_id)
+        return cache is not None and cache["stale_backoff"] > 0
+
+    async def _async_restore_snapshot(self) -> bool:
+        """Seed both coordinators with the last saved state; False if there was none."""
+        try:
+            saved = await self._snapshot_store.async_load()
+        except Exception as err:
+            _LOGGER.debug("Could not load the state snapshot of %s: %s", self.entry.title, err)
+            return False
+        if not isinstance(saved, dict):
+            return False
+        saved_at = saved.get("saved_at")
+        if not isinstance(saved_at, (int, float)) or time.time() - saved_at > SNAPSHOT_MAX_AGE_SECONDS:
+            _LOGGER.debug(
+                "%s: state snapshot saved at %s is too old to restore", self.entry.title, saved_at
+            )
+            return False
+
+        nodes = saved.get("states")
+        states: dict[str, DeviceState] = {}
+        for device_id, node in (nodes if isinstance(nodes, dict) else {}).items():
+            if device_id in self.devices and isinstance(node, dict):
+                states[device_id] = DeviceState.build(*PortaCoolApexAPI._split_device_node(node))
+        if not states:
+            return False
+
+        alerts = saved.get("alerts")
+        self.alerts_coordinator.data = {
+            device_id: AlertIndex.build(device_alerts)
+            for device_id, device_alerts in (alerts if isinstance(alerts, dict) else {}).items()
+            if device_id in self.devices
+        }
+        self.coordinator.data = states
+        self.restored_devices = set(states)
+        _LOGGER.debug(
+            "%s: restored the state of %d unit(s) saved at %s",
+            self.entry.title,
+            len(states),
+            saved.get("saved_at"),
+        )
+        return True
+
+    def _schedule_snapshot_save(self) -> None:
+        # Not pushed back by later changes, so a steady stream of updates still gets saved
+        if self._snapshot_due:
+            return
+        self._snapshot_due = True
+        self._snapshot_store.async_delay_save(self._snapshot, SNAPSHOT_SAVE_DELAY_SECONDS)
+
+    def _snapshot(self) -> dict[str, Any]:
+        self._snapshot_due = False
+        states = self.coordinator.data if isinstance(self.coordinator.data, dict) else {}
+        alerts = self.alerts_coordinator.data if isinstance(self.alerts_coordinator.data, dict) else {}
+        return {
+            "saved_at": time.time(),
+            # Same layout as the RTDB node, so restoring parses it like a read
+            "states": {
+                device_id: {
+                    "datapoints": {str(dp_id): value for dp_id, value in state.datapoints.items()},
+                    "timer": state.timer_info,
+                }
+                for device_id, state in states.items()
+            },
+            "alerts": {device_id: index.alerts for device_id, index in alerts.items()},
+        }
+
+    def _note_live_read(self, device_id: str) -> None:
+        """The unit's state now comes from the cloud rather than the snapshot."""
+        if device_id in self.restored_devices:
+            self.restored_devices.discard(device_id)
+            self.coordinator.async_notify_keys({(device_id, CONNECTIVITY_KEY)})
+            # The alert sensors are on the alerts coordinator, whose first live refresh
+            # usually matches the snapshot and so calls no listener
+            self.alerts_coordinator.async_update_listeners()
+
+    def _rtdb_due(self, device_id: str, state: DeviceState | None, now: float) -> bool:
+        """If power is OFF or the unit is stale and not forcing refresh, throttle network fetches."""
+        cache = self.state_cache[device_id]
+        if now < cache["force_refresh_until"]:
+            return True
+        if cache["stale_backoff"]:
+            return now - cache["last_network_fetch"] >= cache["stale_backoff"]
+        if _power_is_off(state):
+            return now - cache["last_network_fetch"] >= self.offline_refresh_seconds
+        return True
+
+    async def _async_update_data(self) -> dict[str, DeviceState]:
+        try:
+            now = time.time()
+            last_data = self.coordinator.data if isinstance(self.coordinator.data, dict) else {}
+
+            rtdb_ids: list[str] = []
+            for device_id in self.devices:
+                stream = self._streams.get(device_id)
+                if stream is not None and stream.connected:
+                    # Live stream owns datapoints/timer
+                    continue
+                if self._rtdb_due(device_id, last_data.get(device_id), now):
+                    rtdb_ids.append(device_id)
+
+            if not rtdb_ids:
+                self._adapt_poll_interval(now, last_data)
+                return last_data
+
+            # One RTDB read per due device, concurrently; one unit failing keeps the others
+            results = await asyncio.gather(
+                *(self.api.get_rtdb_state(device_id) for device_id in rtdb_ids),
+                return_exceptions=True,
+            )
+            failures = [r for r in results if isinstance(r, BaseException)]
+            if len(failures) == len(results):
+                raise failures[0]
+
+            new_data = dict(last_data)
+            changed = False
+            for device_id, result in zip(rtdb_ids, results):
+                if isinstance(result, BaseException):
+                    # Keep the last known state; the unit is read again next cycle
+                    _LOGGER.debug(
+                        "%s: RTDB read failed: %s", self.devices[device_id].name, result
+                    )
+                    continue
+                datapoints, timer_info = result
+                cache = self.state_cache[device_id]
+                cache["last_network_fetch"] = now
+                self._note_live_read(device_id)
+                previous = last_data.get(device_id) or EMPTY_STATE
+                # An unchanged RTDB read hands back the very objects we published last time
+                # (anything streamed since then would be a new dict)
+                if previous.datapoints is datapoints and previous.timer_info is timer_info:
+                    self._note_unchanged_read(device_id, previous, now)
+                    continue
+                self._note_changed_read(device_id, now)
+
+                signature = _activity_signature(datapoints)
+                last_signature = self._signatures.get(device_id)
+                self._signatures[device_id] = signature
+                ramped = self._fan_ramped(device_id, datapoints)
+                if last_signature is not None and (signature != last_signature or ramped):
+                    cache["last_activity"] = now
+
+                self._refresh_alerts_on_change(previous.datapoints, datapoints)
+                new_data[device_id] = DeviceState.build(datapoints, timer_info)
+                changed = True
+
+            self._adapt_poll_interval(now, new_data)
+            if changed:
+                self._schedule_snapshot_save()
+
+            # Returning the same object lets the coordinator skip notifying entities
+            return new_data if changed else last_data
+
+        except Exception as err:
+            raise UpdateFailed(str(err)) from err
+
+    def _fan_ramped(self, device_id: str, datapoints: dict[int, str]) -> bool:
+        """True when the measured airflow moved by FAN_RAMP_THRESHOLD since it settled."""
+        feedback = _fan_feedback(datapoints)
+        if feedback is None:
+            return False
+        settled = self._fan_settled.setdefault(device_id, feedback)
+        if abs(feedback - settled) < FAN_RAMP_THRESHOLD:
+            return False
+        self._fan_settled[device_id] = feedback
+        return True
+
+    def _note_unchanged_read(self, device_id: str, state: DeviceState, now: float) -> None:
+        """Count a read that returned the same node; mark the unit stale after enough of them."""
+        cache = self.state_cache[device_id]
+        cache["unchanged_reads"] += 1
+        if cache["stale_backoff"]:
+            cache["stale_backoff"] = min(cache["stale_backoff"] * 2, float(STALE_POLL_MAX_SECONDS))
+            return
+        # A unit that is off has nothing to report; the offline throttle covers it
+        if _power_is_off(state):
+            return
+        if (
+            cache["unchanged_reads"] >= STALE_AFTER_READS
+            and now - cache["last_change"] >= STALE_AFTER_SECONDS
+        ):
+            _LOGGER.info(
+                "%s: no change from the cloud in %d reads; treating it as offline",
+                self.devices[device_id].name,
+                cache["unchanged_reads"],
+            )
+            cache["stale_backoff"] = float(STALE_POLL_MIN_SECONDS)
+            self.coordinator.async_notify_keys({(device_id, CONNECTIVITY_KEY)})
+
+    def _note_changed_read(self, device_id: str, now: float) -> None:
+        cache = self.state_cache[device_id]
+        cache["last_change"] = now
+        cache["unchanged_reads"] = 0
+        if cache["stale_backoff"]:
+            _LOGGER.info("%s: cloud state is changing again", self.devices[device_id].name)
+            cache["stale_backoff"] = 0.0
+            self.coordinator.async_notify_keys({(device_id, CONNECTIVITY_KEY)})
+
+    async def _async_update_alerts(self) -> dict[str, AlertIndex]:
+        """Latest alerts for every unit on the entry, in a single POST, indexed once."""
+        try:
+            alerts = await self.api.get_alerts_latest(list(self.devices))
+        except Exception as err:
+            raise UpdateFailed(str(err)) from err
+
+        last = self.alerts_coordinator.data or {}
+        out: dict[str, AlertIndex] = {}
+        for device_id, device_alerts in alerts.items():
+            previous = last.get(device_id)
+            # Keep the previous index when nothing changed; no need to classify again
+            if previous is not None and previous.alerts == device_alerts:
+                out[device_id] = previous
+            else:
+                out[device_id] = AlertIndex.build(device_alerts)
+        if out != last:
+            self._schedule_snapshot_save()
+        return out
+
+    def _refresh_alerts_on_change(
+        self, previous: dict[int, str] | None, datapoints: dict[int, str]
+    ) -> None:
+        """Fetch alerts right away when a datapoint they depend on (water level) moves."""
+        if not previous or self.alerts_coordinator.data is None:
+            return
+        if any(previous.get(dp_id) != datapoints.get(dp_id) for dp_id in ALERT_TRIGGER_DATAPOINTS):
+            # Debounced by the coordinator, so a burst of changes costs one request
+            self.hass.async_create_task(self.alerts_coordinator.async_request_refresh())
+
+    def _adapt_poll_interval(self, now: float, data: dict[str, Any]) -> None:
+        """Poll fast while any polled unit is busy, slow once they have all been steady."""
+        if self.poll_interval_seconds <= 0:
+            return
+
+        base = float(self.poll_interval_seconds)
+        busy = False
+        last_activity = 0.0
+        for device_id, cache in self.state_cache.items():
+            stream = self._streams.get(device_id)
+            if stream is not None and stream.connected:
+                continue
+            if (
+                now < cache["force_refresh_until"]
+                or now - cache["last_activity"] < ACTIVE_WINDOW_SECONDS
+                or self._timer_expiring(data.get(device_id), now)
+            ):
+                busy = True
+                break
+            last_activity = max(last_activity, cache["last_activity"])
+
+        if busy:
+            interval = min(base, ACTIVE_POLL_SECONDS)
+        elif now - last_activity >= STABLE_AFTER_SECONDS:
+            interval = max(base, min(base * STABLE_POLL_FACTOR, STABLE_POLL_MAX_SECONDS))
+        else:
+            interval = base
+
+        if interval != self.effective_poll_seconds:
+            _LOGGER.debug("%s: polling every %ss", self.entry.title, interval)
+            self.effective_poll_seconds = interval
+            # Picked up when the coordinator schedules its next refresh
+            self.coordinator.update_interval = timedelta(seconds=interval)
+            # Only the entities reporting the interval need to know
+            self.coordinator.async_notify_keys(
+                {(device_id, POLL_INTERVAL_KEY) for device_id in self.devices}
+            )
+
+    @staticmethod
+    def _timer_expiring(state: DeviceState | None, now: float) -> bool:
+        expiry = state.timer_expiry if state is not None else None
+        if expiry is None:
+            return False
+        return 0 < expiry.timestamp() - now <= TIMER_EXPIRY_WINDOW_SECONDS
+
+    @callback
+    def _async_stream_update(
+        self,
+        device_id: str,
+        datapoints: dict[int, str],
+        timer_info: dict[str, Any],
+    ) -> None:
+        """Publish a streamed node without disturbing the coordinator poll schedule.
+
+        async_set_updated_data() would reset the refresh timer on every event, so a
+        chatty stream could starve polling of the units that are not streamed.
+        """
+        data = dict(self.coordinator.data or {})
+        current = data.get(device_id) or EMPTY_STATE
+        now = time.time()
+        cache = self.state_cache[device_id]
+        cache["last_network_fetch"] = cache["last_stream_event"] = now
+        self._note_live_read(device_id)
+        # A reconnect replays the whole node; the same values say nothing about the unit
+        unchanged = current.datapoints == datapoints and current.timer_info == timer_info
+        if not unchanged:
+            self._note_changed_read(device_id, now)
+        self.ticker.schedule(
+            ("stream_quiet", device_id),
+            cache["last_change"] + STALE_AFTER_SECONDS,
+            partial(self._async_stream_quiet, device_id),
+        )
+        if unchanged:
+            return
+
+        self._refresh_alerts_on_change(current.datapoints, datapoints)
+        data[device_id] = DeviceState.build(datapoints, timer_info)
+        self._schedule_snapshot_save()
+
+        self.coordinator.data = data
+        self.coordinator.last_update_success = True
+        self.coordinator.async_update_listeners()
+
+    @callback
+    def _async_stream_quiet(self, device_id: str) -> None:
+        """A streamed unit's node has not changed in STALE_AFTER_SECONDS; mark it stale."""
+        stream = self._streams.get(device_id)
+        cache = self.state_cache.get(device_id)
+        # Once the stream drops, polling (and its own stale check) takes over
+        if stream is None or not stream.connected or cache is None or cache["stale_backoff"]:
+            return
+        data = self.coordinator.data or {}
+        # Same as for polled units: a unit that is off has nothing to report
+        if _power_is_off(data.get(device_id)):
+            return
+        _LOGGER.info(
+            "%s: no change on the stream in %ds; treating it as offline",
+            self.devices[device_id].name,
+            STALE_AFTER_SECONDS,
+        )
+        cache["stale_backoff"] = float(STALE_POLL_MIN_SECONDS)
+        self.coordinator.async_notify_keys({(device_id, CONNECTIVITY_KEY)})
+
+    async def _async_discover_devices(self) -> None:
+        """Pick up units added to (or removed from) the account since the entry was created."""
+        try:
+            items = await self.api.get_devices()
+        except Exception as err:
+            _LOGGER.debug("Device discovery failed: %s", err)
+            return
+
+        claimed = claimed_device_ids(self.hass, exclude_entry_id=self.entry.entry_id)
+        devices = [
+            device_entry_data(item)
+            for item in items
+            if isinstance(item, dict) and item.get("uniqueId") and item["uniqueId"] not in claimed
+        ]
+        known = {d["unique_id"] for d in entry_devices(self.entry)}
+        if not devices or {d["unique_id"] for d in devices} == known:
+            return
+        # Reloading is only allowed once setup finished (and not while unloading)
+        if self.entry.state is not ConfigEntryState.LOADED:
+            _LOGGER.debug("%s: device list changed, entry not loaded; not reloading", self.entry.title)
+            return
+
+        _LOGGER.info("PortaCool account device list changed; reloading %s", self.entry.title)
+        self.hass.config_entries.async_update_entry(
+            self.entry,
+            data={**self.entry.data, "devices": devices},
+        )
+        self.hass.async_create_task(self.hass.config_entries.async_reload(self.entry.entry_id))
+
+
+def claimed_device_ids(hass: HomeAssistant, exclude_entry_id: str | None = None) -> set[str]:
+    """Device ids already served by other config entries of this integration."""
+    out: set[str] = set()
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if entry.entry_id == exclude_entry_id:
+            continue
+        out.update(d["unique_id"] for d in entry_devices(entry))
+    return out
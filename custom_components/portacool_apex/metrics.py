@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import math
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Iterable
+from typing import Any
+
+# Samples kept per series; the percentiles describe this recent window
+LATENCY_SAMPLES = 200
+
+# Upper bounds (seconds) of the request latency histogram buckets; one more counts the rest
+LATENCY_BUCKETS_SECONDS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(samples: Iterable[float]) -> dict[str, Any]:
+    """count/p50/p95/max of durations in seconds (None when there are none)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0, "p50": None, "p95": None, "max": None}
+    return {
+        "count": len(ordered),
+        "p50": round(percentile(ordered, 50), 3),
+        "p95": round(percentile(ordered, 95), 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+class LatencySamples:
+    """The most recent durations of one kind, in seconds."""
+
+    def __init__(self, maxlen: int = LATENCY_SAMPLES) -> None:
+        self.samples: deque[float] = deque(maxlen=maxlen)
+        # All-time count, the window only keeps the latest
+        self.total = 0
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(max(0.0, seconds))
+        self.total += 1
+
+    def summary(self) -> dict[str, Any]:
+        return {**latency_summary(self.samples), "total": self.total}
+
+
+def error_key(err: BaseException) -> str:
+    """How a failed request is counted: its HTTP status, "timeout", or the error type."""
+    status = getattr(err, "status", None)
+    if isinstance(status, int):
+        return str(status)
+    if isinstance(err, asyncio.TimeoutError):
+        return "timeout"
+    return type(err).__name__
+
+
+class EndpointStats:
+    """Request counters of one cloud endpoint; every HTTP attempt counts, retries included."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors: dict[str, int] = {}
+        self.bytes = 0
+        self.latency = LatencySamples()
+        self.histogram = [0] * (len(LATENCY_BUCKETS_SECONDS) + 1)
+        # Time spent queued for the endpoint group's concurrency slot before sending
+        self.slot_wait = LatencySamples()
+        self.slot_wait_seconds = 0.0
+
+    def record(
+        self,
+        seconds: float,
+        *,
+        size: int = 0,
+        error: str | None = None,
+        slot_wait: float = 0.0,
+    ) -> None:
+        self.requests += 1
+        self.bytes += size
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+        self.latency.add(seconds)
+        self.histogram[bisect_left(LATENCY_BUCKETS_SECONDS, seconds)] += 1
+        self.slot_wait.add(slot_wait)
+        self.slot_wait_seconds += slot_wait
+
+    def as_dict(self) -> dict[str, Any]:
+        buckets = [f"<={bound}s" for bound in LATENCY_BUCKETS_SECONDS]
+        buckets.append(f">{LATENCY_BUCKETS_SECONDS[-1]}s")
+        return {
+            "requests": self.requests,
+            "errors": sum(self.errors.values()),
+            "errors_by_status": dict(sorted(self.errors.items())),
+            "bytes": self.bytes,
+            "latency": self.latency.summary(),
+            "latency_histogram": dict(zip(buckets, self.histogram)),
+            "slot_wait": self.slot_wait.summary(),
+            "slot_wait_seconds": round(self.slot_wait_seconds, 3),
+        }
@@ -9,6 +9,9 @@ from .const import DOMAIN
 CONF_FIREBASE_WEB_API_KEY = "firebase_web_api_key"
 CONF_POLL_INTERVAL_SECONDS = "poll_interval_seconds"
 CONF_OFFLINE_REFRESH_SECONDS = "offline_refresh_seconds"
+CONF_STREAM_MODE = "stream_mode"
+CONF_ALERTS_INTERVAL_SECONDS = "alerts_interval_seconds"
+CONF_TIMER_RESOLUTION_SECONDS = "timer_resolution_seconds"
 
 
 class PortaCoolApexOptionsFlowHandler(config_entries.OptionsFlow):
@@ -20,7 +23,7 @@ class PortaCoolApexOptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None):
         if user_input is not None:
-            # Save options; HA will call the entry update listener (we add that in __init__.py)
+            # Save options; the entry update listener applies them to the running hub
             return self.async_create_entry(title="", data=user_input)
 
         # Defaults (safe fallbacks if const.py doesn’t define these extras)
@@ -43,12 +46,20 @@ class PortaCoolApexOptionsFlowHandler(config_entries.OptionsFlow):
         current_firebase = self._entry.options.get(CONF_FIREBASE_WEB_API_KEY, firebase_default)
         current_poll = self._entry.options.get(CONF_POLL_INTERVAL_SECONDS, poll_default)
         current_offline = self._entry.options.get(CONF_OFFLINE_REFRESH_SECONDS, offline_default)
+        current_stream = self._entry.options.get(CONF_STREAM_MODE, False)
+        current_alerts = self._entry.options.get(CONF_ALERTS_INTERVAL_SECONDS, 60)
+        current_timer_resolution = self._entry.options.get(CONF_TIMER_RESOLUTION_SECONDS, 1)
 
         schema = vol.Schema(
             {
                 vol.Optional(CONF_FIREBASE_WEB_API_KEY, default=current_firebase): str,
                 vol.Optional(CONF_POLL_INTERVAL_SECONDS, default=int(current_poll)): vol.Coerce(int),
                 vol.Optional(CONF_OFFLINE_REFRESH_SECONDS, default=int(current_offline)): vol.Coerce(int),
+                vol.Optional(CONF_STREAM_MODE, default=bool(current_stream)): bool,
+                vol.Optional(CONF_ALERTS_INTERVAL_SECONDS, default=int(current_alerts)): vol.Coerce(int),
+                vol.Optional(
+                    CONF_TIMER_RESOLUTION_SECONDS, default=int(current_timer_resolution)
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
             }
         )
 
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import random
+import time
+from typing import Any
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a cloud host whose circuit breaker is open."""
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one cloud host.
+
+    closed:    calls go through; `failure_threshold` failures in a row open the circuit
+    open:      calls fail fast with CircuitOpenError until `reset_timeout` has passed
+    half_open: a single trial call is let through; success closes, failure re-opens
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._times_opened = 0
+        self._last_error: str | None = None
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def before_call(self) -> None:
+        if self._state == STATE_CLOSED:
+            return
+        if self._state == STATE_OPEN:
+            remaining = self._opened_at + self._reset_timeout - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(
+                    f"{self.name} circuit open after {self._failures} failures; retry in {remaining:.0f}s"
+                )
+            self._state = STATE_HALF_OPEN
+            self._trial_in_flight = False
+        if self._trial_in_flight:
+            raise CircuitOpenError(f"{self.name} circuit half-open; trial request in flight")
+        self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        self._trial_in_flight = False
+
+    def record_failure(self, err: BaseException | None = None) -> None:
+        self._failures += 1
+        self._trial_in_flight = False
+        if err is not None:
+            # Type and status only: error strings can carry request URLs with auth tokens
+            status = getattr(err, "status", None)
+            self._last_error = f"{type(err).__name__} {status}" if status else type(err).__name__
+        if self._state == STATE_HALF_OPEN or self._failures >= self._failure_threshold:
+            if self._state != STATE_OPEN:
+                self._times_opened += 1
+            self._state = STATE_OPEN
+            self._opened_at = time.monotonic()
+
+    def as_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {
+            "state": self._state,
+            "consecutive_failures": self._failures,
+            "times_opened": self._times_opened,
+            "last_error": self._last_error,
+        }
+        if self._state == STATE_OPEN:
+            out["retry_in_seconds"] = round(
+                max(0.0, self._opened_at + self._reset_timeout - time.monotonic()), 1
+            )
+        return out
@@ -1,18 +1,14 @@
 from __future__ import annotations
 
 import logging
-import time
 from typing import Any
 
 from homeassistant.components.select import SelectEntity
-from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     DOMAIN,
     # Power / gating
     DP_POWER,
-    POWER_VALUES,
     # Fan
     DP_FAN_SPEED,
     FAN_MODE_OPTIONS,
@@ -31,114 +27,33 @@ from .const import (
     # Water safety
     WATER_ALERT_EMPTY,
 )
+from .entity import PortaCoolApexEntity
 
 _LOGGER = logging.getLogger(__name__)
 
-# How long we "trust" the last command to avoid stale cached values flipping UI back
-COMMAND_GRACE_SECONDS = 15
-# How long we bypass offline throttling after a command
-FORCE_REFRESH_SECONDS = 15
 
+class _BasePortaCoolSelect(PortaCoolApexEntity, SelectEntity):
+    """Base class for selects backed by the hub coordinator."""
 
-class _BasePortaCoolSelect(CoordinatorEntity, SelectEntity):
-    """Base class for selects backed by the coordinator."""
-
-    _attr_has_entity_name = True
-
-    def __init__(self, coordinator, api, entry) -> None:
-        super().__init__(coordinator)
-        self._api = api
-        self._entry = entry
-
-        self._last_cmd_ts: float = 0.0
-        # dp_id -> last written value
-        self._last_cmd_values: dict[int, str] = {}
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._api.device_id)},
-            manufacturer="PortaCool",
-            model=self._entry.data.get("model") or "Apex",
-            name=self._entry.data.get("device_name") or "PortaCool Apex",
-        )
-
-    def _get_dp(self, dp_id: int) -> str | None:
-        data = self.coordinator.data or {}
-        dps = data.get("datapoints") if isinstance(data, dict) else None
-        if isinstance(dps, dict) and dp_id in dps:
-            return str(dps[dp_id])
-        return None
-
-    def _get_alerts(self) -> list[dict]:
-        data = self.coordinator.data or {}
-        alerts = data.get("alerts") if isinstance(data, dict) else None
-        return alerts if isinstance(alerts, list) else []
-
-    def _recent_cmd_value(self, dp_id: int) -> str | None:
-        if (time.time() - self._last_cmd_ts) <= COMMAND_GRACE_SECONDS:
-            return self._last_cmd_values.get(dp_id)
-        return None
-
-    def _set_dp_optimistic(self, updates: dict[int, str]) -> None:
-        """Patch coordinator.data['datapoints'] with updated dp values."""
-        data = self.coordinator.data
-        if not isinstance(data, dict):
-            data = {"datapoints": {}, "timer_info": {}, "alerts": []}
-
-        dps = data.get("datapoints")
-        if not isinstance(dps, dict):
-            dps = {}
-
-        new_dps = dict(dps)
-        for k, v in updates.items():
-            new_dps[int(k)] = str(v)
-
-        new_data = dict(data)
-        new_data["datapoints"] = new_dps
-
-        self.coordinator.async_set_updated_data(new_data)
-
-    def _force_refresh_window(self) -> None:
-        """Tell __init__.py coordinator logic to bypass offline throttling briefly."""
-        try:
-            store = self.hass.data[DOMAIN][self._entry.entry_id]
-            cache = store.get("state_cache")
-            if isinstance(cache, dict):
-                cache["force_refresh_until"] = time.time() + FORCE_REFRESH_SECONDS
-        except Exception:
-            return
+    # Every select greys out with main power
+    _watched_datapoints: tuple[int, ...] = (DP_POWER,)
 
     async def _invoke_many_and_update(self, updates: dict[int, str]) -> None:
-        """Invoke one or more datapoints, then optimistic update + force refresh."""
-        for dp_id in sorted(updates.keys()):
-            await self._api.invoke(dp_id, updates[dp_id])
-
-        self._last_cmd_ts = time.time()
-        for dp_id, value in updates.items():
-            self._last_cmd_values[int(dp_id)] = str(value)
+        """Optimistically apply one or more datapoints and queue them for sending.
 
-        self._set_dp_optimistic(updates)
-        self._force_refresh_window()
-
-        self.async_write_ha_state()
-        await self.coordinator.async_request_refresh()
+        Rapid changes (e.g. clicking through fan speeds) are coalesced by the device's
+        command queue into one batch followed by a single confirming refresh.
+        """
+        await self._async_send_commands(updates)
 
     # -------- gating helpers --------
 
     def _power_is_off(self) -> bool:
-        raw = self._get_dp(DP_POWER)
-        return raw == POWER_VALUES[False]
+        return self._state().power_off
 
     def _water_is_empty(self) -> bool:
         """True if Water Tank Empty alert is active (value != 1)."""
-        for a in self._get_alerts():
-            if a.get("alertId") == WATER_ALERT_EMPTY:
-                try:
-                    return int(a.get("value", 1)) != 1
-                except Exception:
-                    return False
-        return False
+        return self._alert_index().is_active(WATER_ALERT_EMPTY)
 
 
 class PortaCoolFanModeSelect(_BasePortaCoolSelect):
@@ -146,11 +61,12 @@ class PortaCoolFanModeSelect(_BasePortaCoolSelect):
 
     _attr_name = "Fan Mode"
     _attr_icon = "mdi:fan"
+    _watched_datapoints = (DP_POWER, DP_FAN_SPEED)
 
-    def __init__(self, coordinator, api, entry) -> None:
-        super().__init__(coordinator, api, entry)
+    def __init__(self, coordinator, device, entry) -> None:
+        super().__init__(coordinator, device, entry)
         # IMPORTANT: keep stable unique_id to avoid duplicate entities
-        self._attr_unique_id = f"{self._api.device_id}_fan_mode"
+        self._attr_unique_id = f"{self._device.device_id}_fan_mode"
         self._attr_options = list(FAN_MODE_OPTIONS)
 
     @property
@@ -160,10 +76,6 @@ class PortaCoolFanModeSelect(_BasePortaCoolSelect):
 
     @property
     def current_option(self) -> str | None:
-        recent = self._recent_cmd_value(DP_FAN_SPEED)
-        if recent is not None:
-            return FAN_VALUE_TO_LABEL.get(recent)
-
         raw = self._get_dp(DP_FAN_SPEED)
         return FAN_VALUE_TO_LABEL.get(raw)
 
@@ -179,11 +91,12 @@ class PortaCoolTimerSelect(_BasePortaCoolSelect):
 
     _attr_name = "Timer"
     _attr_icon = "mdi:timer"
+    _watched_datapoints = (DP_POWER, DP_TIMER)
 
-    def __init__(self, coordinator, api, entry) -> None:
-        super().__init__(coordinator, api, entry)
+    def __init__(self, coordinator, device, entry) -> None:
+        super().__init__(coordinator, device, entry)
         # IMPORTANT: keep stable unique_id to avoid duplicate entities
-        self._attr_unique_id = f"{self._api.device_id}_sleep_timer"
+        self._attr_unique_id = f"{self._device.device_id}_sleep_timer"
         self._attr_options = list(TIMER_OPTIONS.keys())
 
     @property
@@ -193,10 +106,6 @@ class PortaCoolTimerSelect(_BasePortaCoolSelect):
 
     @property
     def current_option(self) -> str | None:
-        recent = self._recent_cmd_value(DP_TIMER)
-        if recent is not None:
-            return next((k for k, v in TIMER_OPTIONS.items() if v == recent), None)
-
         raw = self._get_dp(DP_TIMER)
         return next((k for k, v in TIMER_OPTIONS.items() if v == raw), None)
 
@@ -220,11 +129,14 @@ class PortaCoolPumpModeSelect(_BasePortaCoolSelect):
 
     _attr_name = "Pump Mode"
     _attr_icon = "mdi:water-pump"
+    _watched_datapoints = (DP_POWER, DP_PUMP_ENABLE, DP_PUMP_MODE, DP_PUMP_SPEED)
+    # Water tank alerts gate the pump
+    _follows_alerts = True
 
-    def __init__(self, coordinator, api, entry) -> None:
-        super().__init__(coordinator, api, entry)
+    def __init__(self, coordinator, device, entry) -> None:
+        super().__init__(coordinator, device, entry)
         # IMPORTANT: keep stable unique_id to avoid duplicate entities
-        self._attr_unique_id = f"{self._api.device_id}_pump_mode"
+        self._attr_unique_id = f"{self._device.device_id}_pump_mode"
         self._attr_options = list(PUMP_MODE_OPTIONS)
 
     @property
@@ -241,21 +153,12 @@ class PortaCoolPumpModeSelect(_BasePortaCoolSelect):
         return True
 
     def _pump_enable_raw(self) -> str | None:
-        recent = self._recent_cmd_value(DP_PUMP_ENABLE)
-        if recent is not None:
-            return recent
         return self._get_dp(DP_PUMP_ENABLE)
 
     def _pump_mode_raw(self) -> str | None:
-        recent = self._recent_cmd_value(DP_PUMP_MODE)
-        if recent is not None:
-            return recent
         return self._get_dp(DP_PUMP_MODE)
 
     def _pump_speed_raw(self) -> str | None:
-        recent = self._recent_cmd_value(DP_PUMP_SPEED)
-        if recent is not None:
-            return recent
         return self._get_dp(DP_PUMP_SPEED)
 
     @property
@@ -321,13 +224,17 @@ class PortaCoolPumpModeSelect(_BasePortaCoolSelect):
 
 async def async_setup_entry(hass, entry, async_add_entities):
     data = hass.data[DOMAIN][entry.entry_id]
-    api = data["api"]
+    hub = data["hub"]
     coordinator = data["coordinator"]
 
-    entities = [
-        PortaCoolFanModeSelect(coordinator, api, entry),
-        PortaCoolPumpModeSelect(coordinator, api, entry),
-        PortaCoolTimerSelect(coordinator, api, entry),
-    ]
+    entities = []
+    for device in hub.devices.values():
+        entities.extend(
+            [
+                PortaCoolFanModeSelect(coordinator, device, entry),
+                PortaCoolPumpModeSelect(coordinator, device, entry),
+                PortaCoolTimerSelect(coordinator, device, entry),
+            ]
+        )
 
-    async_add_entities(entities, True)
\ No newline at end of file
+    async_add_entities(entities)
\ No newline at end of file
@@ -1,19 +1,22 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+import math
+from datetime import datetime, timezone
+from functools import partial
 from typing import Any
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.const import (
+    EntityCategory,
     PERCENTAGE,
     UnitOfElectricPotential,
     UnitOfTemperature,
     UnitOfTime,
 )
-from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.helpers.event import async_track_time_interval
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 
+from .api import ENDPOINTS
 from .const import (
     ALERT_CATEGORIES,
     DOMAIN,
@@ -38,93 +41,69 @@ from .const import (
     # airflow
     FAN_CFM_MAX,
 )
+from .coordinator import COMMANDS_KEY
+from .entity import PortaCoolApexEntity
+from .state import STATE_FIELD_BY_DP
 
-
-def _category_key(alert_id: str) -> str | None:
-    if not isinstance(alert_id, str) or "-" not in alert_id:
-        return None
-    return alert_id.split("-", 1)[0]
-
-
-def _is_active(alert: dict) -> bool:
-    try:
-        return int(alert.get("value", 1)) != 1
-    except Exception:
-        return False
+# Names of the per-endpoint request sensors
+ENDPOINT_LABELS = {
+    "signin": "Signin",
+    "devices": "Device List",
+    "alerts": "Alerts",
+    "invoke": "Commands",
+    "firebase_custom_token": "Firebase Custom Token",
+    "verify_custom_token": "Verify Custom Token",
+    "rtdb_node": "RTDB Reads",
+}
 
 
-def _severity(active_alerts: list[dict]) -> str:
-    if any(a.get("alertType") == "Error" for a in active_alerts):
-        return "Error"
-    if any(a.get("alertType") == "Warning" for a in active_alerts):
-        return "Warning"
-    return "OK"
+class _BasePortaCoolSensor(PortaCoolApexEntity, SensorEntity):
+    """Base class for sensors backed by the hub coordinator."""
 
 
-def _parse_timerexpiry(ts: Any) -> datetime | None:
-    """Parse TimerExpiry like: 2026-01-29T06:54:30.3051500Z"""
-    if not isinstance(ts, str) or not ts:
-        return None
-
-    s = ts.strip()
-    if s.endswith("Z"):
-        s = s[:-1] + "+00:00"
-
-    if "." in s:
-        head, tail = s.split(".", 1)
-        if "+" in tail:
-            frac, rest = tail.split("+", 1)
-            frac = (frac + "000000")[:6]
-            s = f"{head}.{frac}+{rest}"
-        else:
-            frac = (tail + "000000")[:6]
-            s = f"{head}.{frac}"
-
-    try:
-        dt = datetime.fromisoformat(s)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt.astimezone(timezone.utc)
-    except Exception:
-        return None
+class _TimeDependentSensor(_BasePortaCoolSensor):
+    """Sensor whose value also moves with time.
 
+    Instead of ticking every second, it tells the entry's shared ticker when its value
+    will next change (`_next_change_at`) and is only written when it really did.
+    """
 
-class _BasePortaCoolSensor(CoordinatorEntity, SensorEntity):
-    _attr_has_entity_name = True
+    _written_value: Any = None
 
-    def __init__(self, coordinator, api, entry):
-        super().__init__(coordinator)
-        self._api = api
-        self._entry = entry
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(partial(self._hub.ticker.cancel, self))
+        self._refresh()
+        self._schedule_next()
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._api.device_id)},
-            manufacturer="PortaCool",
-            model=self._entry.data.get("model") or "Apex",
-            name=self._entry.data.get("device_name") or "PortaCool Apex",
-        )
+    def _refresh(self) -> None:
+        """Pick up new coordinator data before rendering."""
 
-    def _get_dp(self, dp_id: int) -> str | None:
-        data = self.coordinator.data or {}
-        dps = data.get("datapoints") if isinstance(data, dict) else None
-        if isinstance(dps, dict) and dp_id in dps:
-            return str(dps[dp_id])
+    def _next_change_at(self) -> float | None:
         return None
 
-    def _get_alerts(self) -> list[dict]:
-        data = self.coordinator.data or {}
-        alerts = data.get("alerts") if isinstance(data, dict) else None
-        return alerts if isinstance(alerts, list) else []
+    @callback
+    def _schedule_next(self) -> None:
+        self._hub.ticker.schedule(self, self._next_change_at(), self._async_tick)
 
-    def _timer_info(self) -> dict[str, Any]:
-        data = self.coordinator.data or {}
-        ti = data.get("timer_info") if isinstance(data, dict) else None
-        return ti if isinstance(ti, dict) else {}
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._refresh()
+        self._write()
+        self._schedule_next()
+
+    @callback
+    def _async_tick(self) -> None:
+        if self.native_value != self._written_value:
+            self._write()
+        self._schedule_next()
+
+    def _write(self) -> None:
+        self._written_value = self.native_value
+        self.async_write_ha_state()
 
 
-class PortaCoolAirflowSensor(_BasePortaCoolSensor):
+class PortaCoolAirflowSensor(_TimeDependentSensor):
     """DP7 = observed airflow/feedback value.
 
     When fan is commanded Off (DP13 == "0"), DP7 can linger briefly.
@@ -134,39 +113,31 @@ class PortaCoolAirflowSensor(_BasePortaCoolSensor):
     _attr_name = "Calculated Airflow (CFM)"
     _attr_icon = "mdi:calculator"
     _attr_state_class = "measurement"
+    _watched_datapoints = (DP_FAN_FEEDBACK, DP_FAN_SPEED)
 
     _OFF_GRACE_SECONDS = 10
 
-    def __init__(self, coordinator, api, entry):
-        super().__init__(coordinator, api, entry)
+    def __init__(self, coordinator, device, entry):
+        super().__init__(coordinator, device, entry)
         # IMPORTANT: keep stable unique_id
-        self._attr_unique_id = f"{self._api.device_id}_fan_feedback"
+        self._attr_unique_id = f"{self._device.device_id}_fan_feedback"
 
         self._last_raw: int | None = None
         self._last_change_ts: float | None = None
-        self._unsub_tick = None
 
-    async def async_added_to_hass(self) -> None:
-        await super().async_added_to_hass()
-        self._update_tracking()
-        self.async_on_remove(self.coordinator.async_add_listener(self._handle_coordinator_update))
-        self._unsub_tick = async_track_time_interval(self.hass, self._tick, timedelta(seconds=1))
-        self.async_on_remove(self._unsub_tick)
-
-    def _handle_coordinator_update(self) -> None:
+    def _refresh(self) -> None:
         self._update_tracking()
-        self.async_write_ha_state()
 
-    async def _tick(self, _now: datetime) -> None:
-        self.async_write_ha_state()
+    def _next_change_at(self) -> float | None:
+        """End of the off grace period, if the fan is off and DP7 is still lingering."""
+        if self._get_dp(DP_FAN_SPEED) != "0" or not self._last_raw or self._last_change_ts is None:
+            return None
+        due = self._last_change_ts + self._OFF_GRACE_SECONDS
+        return due if due > datetime.now(timezone.utc).timestamp() else None
 
     def _update_tracking(self) -> None:
-        raw = self._get_dp(DP_FAN_FEEDBACK)
-        if raw is None:
-            return
-        try:
-            val = int(float(raw))
-        except Exception:
+        val = self._state().fan_feedback
+        if val is None:
             return
 
         now = datetime.now(timezone.utc).timestamp()
@@ -191,12 +162,8 @@ class PortaCoolAirflowSensor(_BasePortaCoolSensor):
 
     @property
     def native_value(self):
-        raw = self._get_dp(DP_FAN_FEEDBACK)
-        if raw is None:
-            return None
-        try:
-            val = int(float(raw))
-        except Exception:
+        val = self._state().fan_feedback
+        if val is None:
             return None
 
         self._update_tracking()
@@ -206,8 +173,7 @@ class PortaCoolAirflowSensor(_BasePortaCoolSensor):
 
         return val
 
-    @property
-    def extra_state_attributes(self):
+    def _extra_attributes(self):
         return {
             "raw": self._get_dp(DP_FAN_FEEDBACK),
             "dp": DP_FAN_FEEDBACK,
@@ -216,26 +182,22 @@ class PortaCoolAirflowSensor(_BasePortaCoolSensor):
         }
 
 
-class PortaCoolAirflowPercentSensor(_BasePortaCoolSensor):
+class PortaCoolAirflowPercentSensor(_TimeDependentSensor):
     _attr_name = "Max Airflow %"
     _attr_icon = "mdi:percent"
     _attr_native_unit_of_measurement = PERCENTAGE
     _attr_state_class = "measurement"
+    _watched_datapoints = (DP_FAN_FEEDBACK, DP_FAN_SPEED)
 
-    def __init__(self, coordinator, api, entry, airflow_sensor: PortaCoolAirflowSensor):
-        super().__init__(coordinator, api, entry)
+    def __init__(self, coordinator, device, entry, airflow_sensor: PortaCoolAirflowSensor):
+        super().__init__(coordinator, device, entry)
         # IMPORTANT: keep stable unique_id
-        self._attr_unique_id = f"{self._api.device_id}_fan_feedback_percent"
+        self._attr_unique_id = f"{self._device.device_id}_fan_feedback_percent"
         self._airflow_sensor = airflow_sensor
-        self._unsub_tick = None
 
-    async def async_added_to_hass(self) -> None:
-        await super().async_added_to_hass()
-        self._unsub_tick = async_track_time_interval(self.hass, self._tick, timedelta(seconds=1))
-        self.async_on_remove(self._unsub_tick)
-
-    async def _tick(self, _now: datetime) -> None:
-        self.async_write_ha_state()
+    def _next_change_at(self) -> float | None:
+        # Derived from the airflow sensor, so it changes exactly when that one does
+        return self._airflow_sensor._next_change_at()
 
     @property
     def native_value(self):
@@ -255,8 +217,7 @@ class PortaCoolAirflowPercentSensor(_BasePortaCoolSensor):
         pct = round((val / float(FAN_CFM_MAX)) * 100)
         return max(0, min(100, pct))
 
-    @property
-    def extra_state_attributes(self):
+    def _extra_attributes(self):
         return {
             "cfm_max": FAN_CFM_MAX,
             "dp": DP_FAN_FEEDBACK,
@@ -264,53 +225,47 @@ class PortaCoolAirflowPercentSensor(_BasePortaCoolSensor):
         }
 
 
-class PortaCoolTimerRemainingSensor(_BasePortaCoolSensor):
+class PortaCoolTimerRemainingSensor(_TimeDependentSensor):
+    """Seconds left on the sleep timer, stepping at the entry's timer resolution."""
+
     _attr_name = "Timer Remaining"
     _attr_native_unit_of_measurement = UnitOfTime.SECONDS
     _attr_icon = "mdi:timer-sand"
     _attr_state_class = "measurement"
+    _watches_timer = True
 
-    def __init__(self, coordinator, api, entry):
-        super().__init__(coordinator, api, entry)
-        self._attr_unique_id = f"{self._api.device_id}_timer_remaining"
+    def __init__(self, coordinator, device, entry):
+        super().__init__(coordinator, device, entry)
+        self._attr_unique_id = f"{self._device.device_id}_timer_remaining"
 
         self._expiry_raw: str | None = None
         self._expiry_dt: datetime | None = None
-        self._unsub_tick = None
-
-    async def async_added_to_hass(self) -> None:
-        await super().async_added_to_hass()
-
-        self._refresh_timer_info()
-        self.async_on_remove(self.coordinator.async_add_listener(self._handle_coordinator_update))
-
-        self._unsub_tick = async_track_time_interval(self.hass, self._tick, timedelta(seconds=1))
-        self.async_on_remove(self._unsub_tick)
 
-    def _handle_coordinator_update(self) -> None:
-        self._refresh_timer_info()
-        self.async_write_ha_state()
-
-    async def _tick(self, _now: datetime) -> None:
-        self.async_write_ha_state()
+    def _next_change_at(self) -> float | None:
+        """The moment the countdown steps down to its next value."""
+        value = self.native_value
+        if not self._expiry_dt or value <= 0:
+            return None
+        return self._expiry_dt.timestamp() - (value - self._hub.timer_resolution_seconds)
 
-    def _refresh_timer_info(self) -> None:
-        ti = self._timer_info()
-        raw = ti.get("TimerExpiry")
-        if raw != self._expiry_raw:
-            self._expiry_raw = raw
-            self._expiry_dt = _parse_timerexpiry(raw)
+    def _refresh(self) -> None:
+        state = self._state()
+        self._expiry_raw = state.timer_info.get("TimerExpiry")
+        self._expiry_dt = state.timer_expiry
 
     @property
     def native_value(self) -> int:
         if not self._expiry_dt:
             return 0
         now = datetime.now(timezone.utc)
-        remaining = int((self._expiry_dt - now).total_seconds())
-        return max(0, remaining)
+        remaining = (self._expiry_dt - now).total_seconds()
+        if remaining <= 0:
+            return 0
+        # Round up to the resolution so it never reads 0 while the timer is still running
+        resolution = self._hub.timer_resolution_seconds
+        return int(math.ceil(remaining / resolution) * resolution)
 
-    @property
-    def extra_state_attributes(self):
+    def _extra_attributes(self):
         return {
             "TimerExpiry": self._expiry_raw,
             "TimerExpiryUtc": self._expiry_dt.isoformat() if self._expiry_dt else None,
@@ -322,25 +277,20 @@ class PortaCoolTemperatureSensor(_BasePortaCoolSensor):
     _attr_device_class = "temperature"
     _attr_state_class = "measurement"
 
-    def __init__(self, coordinator, api, entry, name: str, unique_suffix: str, dp_id: int, icon: str):
-        super().__init__(coordinator, api, entry)
+    def __init__(self, coordinator, device, entry, name: str, unique_suffix: str, dp_id: int, icon: str):
+        super().__init__(coordinator, device, entry)
         self._attr_name = name
-        self._attr_unique_id = f"{self._api.device_id}_{unique_suffix}"
+        self._attr_unique_id = f"{self._device.device_id}_{unique_suffix}"
         self._dp_id = dp_id
+        self._state_field = STATE_FIELD_BY_DP[dp_id]
+        self._watched_datapoints = (dp_id,)
         self._attr_icon = icon
 
     @property
     def native_value(self):
-        raw = self._get_dp(self._dp_id)
-        if raw is None:
-            return None
-        try:
-            return int(round(float(raw)))
-        except Exception:
-            return None
+        return getattr(self._state(), self._state_field)
 
-    @property
-    def extra_state_attributes(self):
+    def _extra_attributes(self):
         return {"raw": self._get_dp(self._dp_id), "dp": self._dp_id}
 
 
@@ -349,23 +299,17 @@ class PortaCoolInputVoltageSensor(_BasePortaCoolSensor):
     _attr_native_unit_of_measurement = UnitOfElectricPotential.VOLT
     _attr_device_class = "voltage"
     _attr_state_class = "measurement"
+    _watched_datapoints = (DP_VOLTAGE_A, DP_VOLTAGE_B)
 
-    def __init__(self, coordinator, api, entry):
-        super().__init__(coordinator, api, entry)
-        self._attr_unique_id = f"{self._api.device_id}_input_voltage"
+    def __init__(self, coordinator, device, entry):
+        super().__init__(coordinator, device, entry)
+        self._attr_unique_id = f"{self._device.device_id}_input_voltage"
 
     @property
     def native_value(self):
-        raw = self._get_dp(DP_VOLTAGE_B) or self._get_dp(DP_VOLTAGE_A)
-        if raw is None:
-            return None
-        try:
-            return float(raw)
-        except Exception:
-            return None
+        return self._state().voltage
 
-    @property
-    def extra_state_attributes(self):
+    def _extra_attributes(self):
         return {
             "voltage_primary_dp": DP_VOLTAGE_B,
             "voltage_alt_dp": DP_VOLTAGE_A,
@@ -374,21 +318,96 @@ class PortaCoolInputVoltageSensor(_BasePortaCoolSensor):
         }
 
 
+class PortaCoolCommandLatencySensor(_BasePortaCoolSensor):
+    """p95 time from sending a command until the cloud reports the new value.
+
+    p50/max and the per-datapoint breakdown are attributes. Polled units only notice
+    the change on their next read, so this includes up to one (fast) poll interval.
+    """
+
+    _attr_name = "Command Latency"
+    _attr_icon = "mdi:timer-check-outline"
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_device_class = "duration"
+    _attr_state_class = "measurement"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator, device, entry):
+        super().__init__(coordinator, device, entry)
+        self._attr_unique_id = f"{self._device.device_id}_command_latency"
+
+    def _listen_context(self) -> frozenset | None:
+        return frozenset({(self._device.device_id, COMMANDS_KEY)})
+
+    @property
+    def native_value(self) -> float | None:
+        return self.coordinator.command_stats(self._device.device_id)["p95"]
+
+    def _extra_attributes(self) -> dict[str, Any]:
+        stats = self.coordinator.command_stats(self._device.device_id)
+        return {
+            "p50": stats["p50"],
+            "max": stats["max"],
+            "count": stats["count"],
+            "unconfirmed": stats["unconfirmed"],
+            "already_set": stats["already_set"],
+            "datapoints": stats["datapoints"],
+        }
+
+
+class PortaCoolEndpointRequestsSensor(SensorEntity):
+    """Requests this account made to one cloud endpoint; errors, bytes and latency as attributes.
+
+    Account-wide rather than per unit, so it sits on the entry's service device and
+    polls the API's counters instead of following a coordinator.
+    """
+
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:cloud-sync-outline"
+    _attr_state_class = "total_increasing"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, hub, entry, endpoint: str):
+        # Read through the hub: its client changes if the entry moves to another account
+        self._hub = hub
+        self._endpoint = endpoint
+        self._stats: dict[str, Any] = {}
+        self._attr_name = f"{ENDPOINT_LABELS.get(endpoint, endpoint)} Requests"
+        self._attr_unique_id = f"{entry.entry_id}_requests_{endpoint}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            entry_type=DeviceEntryType.SERVICE,
+            manufacturer="PortaCool",
+            model="Cloud account",
+            name=entry.title,
+        )
+
+    async def async_update(self) -> None:
+        self._stats = self._hub.api.request_stats().get(self._endpoint, {})
+
+    @property
+    def native_value(self) -> int | None:
+        return self._stats.get("requests")
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {k: v for k, v in self._stats.items() if k != "requests"}
+
+
 class PortaCoolWaterAlertSensor(_BasePortaCoolSensor):
     """Water Alert: Tank Empty / Tank Low / Tank Overfill / OK (based on alerts)."""
 
     _attr_name = "Water Alert"
     _attr_icon = "mdi:water-alert"
 
-    def __init__(self, coordinator, api, entry):
-        super().__init__(coordinator, api, entry)
-        self._attr_unique_id = f"{self._api.device_id}_water_alert"
+    def __init__(self, coordinator, device, entry):
+        super().__init__(coordinator, device, entry)
+        self._attr_unique_id = f"{self._device.device_id}_water_alert"
 
     @property
     def native_value(self):
-        alerts = self._get_alerts()
-        active = [a for a in alerts if _is_active(a)]
-        active_ids = {a.get("alertId") for a in active}
+        active_ids = self._alert_index().active_ids
 
         if WATER_ALERT_OVERFLOW in active_ids:
             return "Tank Overfill"
@@ -398,11 +417,8 @@ class PortaCoolWaterAlertSensor(_BasePortaCoolSensor):
             return "Tank Low"
         return "OK"
 
-    @property
-    def extra_state_attributes(self):
-        alerts = self._get_alerts()
-        active = [a for a in alerts if _is_active(a)]
-        water_active = [a for a in active if _category_key(a.get("alertId", "")) == "4"]
+    def _extra_attributes(self):
+        water_active = self._alert_index().category_active("4")
         return {"active_count": len(water_active), "active_alerts": water_active}
 
 
@@ -420,16 +436,16 @@ class PortaCoolWaterLevelSensor(_BasePortaCoolSensor):
     _attr_icon = "mdi:water-percent"
     _attr_native_unit_of_measurement = PERCENTAGE
     _attr_state_class = "measurement"
+    _watched_datapoints = (DP_WATER_LEVEL,)
+    _follows_alerts = True
 
-    def __init__(self, coordinator, api, entry):
-        super().__init__(coordinator, api, entry)
-        self._attr_unique_id = f"{self._api.device_id}_water_level"
+    def __init__(self, coordinator, device, entry):
+        super().__init__(coordinator, device, entry)
+        self._attr_unique_id = f"{self._device.device_id}_water_level"
 
     @property
     def native_value(self):
-        alerts = self._get_alerts()
-        active = [a for a in alerts if _is_active(a)]
-        active_ids = {a.get("alertId") for a in active}
+        active_ids = self._alert_index().active_ids
 
         if WATER_ALERT_OVERFLOW in active_ids:
             return WATER_VALUE_OVERFLOW
@@ -438,19 +454,9 @@ class PortaCoolWaterLevelSensor(_BasePortaCoolSensor):
         if WATER_ALERT_LOW in active_ids:
             return WATER_VALUE_LOW
 
-        raw = self._get_dp(DP_WATER_LEVEL)
-        if raw is None:
-            return None
-        mapped = WATER_LEVEL_MAP.get(str(raw))
-        if mapped is None:
-            return None
-        try:
-            return float(mapped)
-        except Exception:
-            return None
+        return self._state().water_level
 
-    @property
-    def extra_state_attributes(self):
+    def _extra_attributes(self):
         return {
             "water_level_dp": DP_WATER_LEVEL,
             "water_level_raw": self._get_dp(DP_WATER_LEVEL),
@@ -464,28 +470,18 @@ class PortaCoolWaterLevelSensor(_BasePortaCoolSensor):
 class PortaCoolCategoryStatusSensor(_BasePortaCoolSensor):
     """Status sensors for non-water categories (Fan/Pump/Louvers/Temp/Voltage)."""
 
-    def __init__(self, coordinator, api, entry, cat_num: str, cat_name: str):
-        super().__init__(coordinator, api, entry)
+    def __init__(self, coordinator, device, entry, cat_num: str, cat_name: str):
+        super().__init__(coordinator, device, entry)
         self._cat_num = cat_num
         self._attr_name = f"{cat_name} Status"
-        self._attr_unique_id = f"{self._api.device_id}_alert_{cat_num}"
+        self._attr_unique_id = f"{self._device.device_id}_alert_{cat_num}"
 
     @property
     def native_value(self):
-        alerts = self._get_alerts()
-        active = [
-            a for a in alerts
-            if _category_key(a.get("alertId", "")) == self._cat_num and _is_active(a)
-        ]
-        return _severity(active)
+        return self._alert_index().category_status(self._cat_num)
 
-    @property
-    def extra_state_attributes(self):
-        alerts = self._get_alerts()
-        active = [
-            a for a in alerts
-            if _category_key(a.get("alertId", "")) == self._cat_num and _is_active(a)
-        ]
+    def _extra_attributes(self):
+        active = self._alert_index().category_active(self._cat_num)
         return {"active_count": len(active), "active_alerts": active}
 
 class PortaCoolRelativeHumiditySensor(_BasePortaCoolSensor):
@@ -499,41 +495,28 @@ class PortaCoolRelativeHumiditySensor(_BasePortaCoolSensor):
     def __init__(
         self,
         coordinator,
-        api,
+        device,
         entry,
         name: str = "Relative Humidity",
         unique_suffix: str = "relative_humidity",
         dp_id: int = DP_RELATIVE_HUMIDITY,
         icon: str | None = None,
     ):
-        super().__init__(coordinator, api, entry)
+        super().__init__(coordinator, device, entry)
         self._attr_name = name
-        self._attr_unique_id = f"{self._api.device_id}_{unique_suffix}"
+        self._attr_unique_id = f"{self._device.device_id}_{unique_suffix}"
         self._dp_id = dp_id
+        self._state_field = STATE_FIELD_BY_DP[dp_id]
+        self._watched_datapoints = (dp_id,)
         if icon:
             self._attr_icon = icon
 
     @property
     def native_value(self) -> float | None:
-        raw = self._get_dp(self._dp_id)
-        if raw is None:
-            return None
-        try:
-            val = float(raw)
-        except Exception:
-            return None
-
-        # Clamp to valid RH range
-        if val < 0:
-            val = 0.0
-        elif val > 100:
-            val = 100.0
+        # Clamped to the valid RH range and kept to one decimal when parsed
+        return getattr(self._state(), self._state_field)
 
-        # Keep one decimal if present; HA can chart floats fine
-        return round(val, 1)
-
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
+    def _extra_attributes(self) -> dict[str, Any]:
         return {"raw": self._get_dp(self._dp_id), "dp": self._dp_id}
 
 
@@ -541,57 +524,65 @@ class PortaCoolOverallStatusSensor(_BasePortaCoolSensor):
     _attr_name = "Overall Status"
     _attr_icon = "mdi:shield-alert-outline"
 
-    def __init__(self, coordinator, api, entry):
-        super().__init__(coordinator, api, entry)
-        self._attr_unique_id = f"{self._api.device_id}_overall_status"
+    def __init__(self, coordinator, device, entry):
+        super().__init__(coordinator, device, entry)
+        self._attr_unique_id = f"{self._device.device_id}_overall_status"
 
     @property
     def native_value(self):
-        alerts = self._get_alerts()
-        active = [a for a in alerts if _is_active(a)]
-        return _severity(active)
+        return self._alert_index().severity
 
-    @property
-    def extra_state_attributes(self):
-        alerts = self._get_alerts()
-        active = [a for a in alerts if _is_active(a)]
-        return {"active_count": len(active)}
+    def _extra_attributes(self):
+        return {"active_count": len(self._alert_index().active)}
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
     data = hass.data[DOMAIN][entry.entry_id]
-    api = data["api"]
+    hub = data["hub"]
     coordinator = data["coordinator"]
 
-    device_name = (entry.data.get("device_name") or "").upper()
+    entities: list[SensorEntity] = []
+    for device in hub.devices.values():
+        entities.extend(_device_sensors(coordinator, hub.alerts_coordinator, device, entry))
+    async_add_entities(entities)
+
+    # Polled from the API's counters (no network), so they can be read before adding
+    async_add_entities(
+        [PortaCoolEndpointRequestsSensor(hub, entry, endpoint) for endpoint in ("signin", *ENDPOINTS)],
+        True,
+    )
+
+
+def _device_sensors(coordinator, alerts_coordinator, device, entry) -> list[SensorEntity]:
+    device_name = (device.name or "").upper()
     has_louvers = any(x in device_name for x in ("APEX 500", "APEX 700"))
 
-    airflow_raw = PortaCoolAirflowSensor(coordinator, api, entry)
-    airflow_pct = PortaCoolAirflowPercentSensor(coordinator, api, entry, airflow_raw)
+    airflow_raw = PortaCoolAirflowSensor(coordinator, device, entry)
+    airflow_pct = PortaCoolAirflowPercentSensor(coordinator, device, entry, airflow_raw)
 
     temp_ambient = PortaCoolTemperatureSensor(
-        coordinator, api, entry,
+        coordinator, device, entry,
         name="Ambient Temperature",
         unique_suffix="ambient_temp",
         dp_id=DP_AMBIENT_TEMP,
         icon="mdi:weather-windy",
     )
     temp_exit = PortaCoolTemperatureSensor(
-        coordinator, api, entry,
+        coordinator, device, entry,
         name="Exit Temperature",
         unique_suffix="exit_temp",
         dp_id=DP_EXIT_TEMP,
         icon="mdi:air-conditioner",
     )
     temp_internal_component = PortaCoolTemperatureSensor(
-        coordinator, api, entry,
+        coordinator, device, entry,
         name="Internal Component Temperature",
         unique_suffix="internal_component_temp",
         dp_id=DP_INTERNAL_COMPONENT_TEMP,
         icon="mdi:thermometer",
     )
     relative_humidity = PortaCoolRelativeHumiditySensor(
-        coordinator, api, entry,
+        coordinator, device, entry,
         name="Relative Humidity",
         unique_suffix="relative_humidity",
         dp_id=DP_RELATIVE_HUMIDITY,
@@ -601,15 +592,16 @@ async def async_setup_entry(hass, entry, async_add_entities):
     entities: list[SensorEntity] = [
         airflow_raw,
         airflow_pct,
-        PortaCoolTimerRemainingSensor(coordinator, api, entry),
+        PortaCoolTimerRemainingSensor(coordinator, device, entry),
         temp_ambient,
         temp_exit,
         temp_internal_component,
         relative_humidity,
-        PortaCoolInputVoltageSensor(coordinator, api, entry),
-        PortaCoolWaterAlertSensor(coordinator, api, entry),
-        PortaCoolWaterLevelSensor(coordinator, api, entry),
-        PortaCoolOverallStatusSensor(coordinator, api, entry),
+        PortaCoolInputVoltageSensor(coordinator, device, entry),
+        PortaCoolWaterAlertSensor(alerts_coordinator, device, entry),
+        PortaCoolWaterLevelSensor(coordinator, device, entry),
+        PortaCoolOverallStatusSensor(alerts_coordinator, device, entry),
+        PortaCoolCommandLatencySensor(coordinator, device, entry),
     ]
 
     # Category status sensors:
@@ -620,6 +612,8 @@ async def async_setup_entry(hass, entry, async_add_entities):
             continue
         if cat_num == "3" and not has_louvers:
             continue
-        entities.append(PortaCoolCategoryStatusSensor(coordinator, api, entry, cat_num, cat_name))
+        entities.append(
+            PortaCoolCategoryStatusSensor(alerts_coordinator, device, entry, cat_num, cat_name)
+        )
 
-    async_add_entities(entities, True)
\ No newline at end of file
+    return entities
\ No newline at end of file
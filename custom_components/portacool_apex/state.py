@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from .const import (
+    DP_AMBIENT_TEMP,
+    DP_EXIT_TEMP,
+    DP_FAN_FEEDBACK,
+    DP_INTERNAL_COMPONENT_TEMP,
+    DP_POWER,
+    DP_RELATIVE_HUMIDITY,
+    DP_VOLTAGE_A,
+    DP_VOLTAGE_B,
+    DP_WATER_LEVEL,
+    POWER_VALUES,
+    WATER_LEVEL_MAP,
+)
+
+# DeviceState field holding the parsed value of each numeric datapoint, for sensors
+# that are configured with a datapoint id
+STATE_FIELD_BY_DP = {
+    DP_AMBIENT_TEMP: "ambient_temp",
+    DP_EXIT_TEMP: "exit_temp",
+    DP_INTERNAL_COMPONENT_TEMP: "internal_temp",
+    DP_RELATIVE_HUMIDITY: "humidity",
+}
+
+
+def parse_timer_expiry(ts: Any) -> datetime | None:
+    """Parse TimerExpiry like: 2026-01-29T06:54:30.3051500Z"""
+    if not isinstance(ts, str) or not ts:
+        return None
+
+    s = ts.strip()
+    if s.endswith("Z"):
+        s = s[:-1] + "+00:00"
+
+    if "." in s:
+        head, tail = s.split(".", 1)
+        if "+" in tail:
+            frac, rest = tail.split("+", 1)
+            frac = (frac + "000000")[:6]
+            s = f"{head}.{frac}+{rest}"
+        else:
+            frac = (tail + "000000")[:6]
+            s = f"{head}.{frac}"
+
+    try:
+        dt = datetime.fromisoformat(s)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc)
+    except Exception:
+        return None
+
+
+def _float(raw: str | None) -> float | None:
+    if raw is None:
+        return None
+    try:
+        value = float(raw)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _rounded(raw: str | None) -> int | None:
+    value = _float(raw)
+    return int(round(value)) if value is not None else None
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceState:
+    """One unit's state, parsed once per update; what every entity renders from.
+
+    `datapoints` (raw strings by id) and `timer_info` are kept as received so the hub
+    can tell an unchanged RTDB read by identity and entities can expose raw values.
+    """
+
+    datapoints: dict[int, str]
+    timer_info: dict[str, Any]
+
+    # Derived from the two above, so left out of equality
+    power_on: bool | None = field(compare=False)
+    power_off: bool = field(compare=False)
+    fan_feedback: int | None = field(compare=False)
+    ambient_temp: int | None = field(compare=False)
+    exit_temp: int | None = field(compare=False)
+    internal_temp: int | None = field(compare=False)
+    humidity: float | None = field(compare=False)
+    voltage: float | None = field(compare=False)
+    water_level: float | None = field(compare=False)
+    timer_expiry: datetime | None = field(compare=False)
+
+    @classmethod
+    def build(cls, datapoints: dict[int, str], timer_info: dict[str, Any]) -> DeviceState:
+        dp = datapoints.get
+
+        power = dp(DP_POWER)
+
+        fan_feedback = _float(dp(DP_FAN_FEEDBACK))
+
+        humidity = _float(dp(DP_RELATIVE_HUMIDITY))
+        if humidity is not None:
+            # Clamp to valid RH range, keep one decimal
+            humidity = round(min(100.0, max(0.0, humidity)), 1)
+
+        water_level = WATER_LEVEL_MAP.get(dp(DP_WATER_LEVEL) or "")
+
+        return cls(
+            datapoints=datapoints,
+            timer_info=timer_info,
+            power_on=(power == POWER_VALUES[True]) if power is not None else None,
+            power_off=power == POWER_VALUES[False],
+            fan_feedback=int(fan_feedback) if fan_feedback is not None else None,
+            ambient_temp=_rounded(dp(DP_AMBIENT_TEMP)),
+            exit_temp=_rounded(dp(DP_EXIT_TEMP)),
+            internal_temp=_rounded(dp(DP_INTERNAL_COMPONENT_TEMP)),
+            humidity=humidity,
+            # Prefer the B leg, fall back to A
+            voltage=_float(dp(DP_VOLTAGE_B) or dp(DP_VOLTAGE_A)),
+            water_level=float(water_level) if water_level is not None else None,
+            timer_expiry=parse_timer_expiry(timer_info.get("TimerExpiry")),
+        )
+
+
+EMPTY_STATE = DeviceState.build({}, {})
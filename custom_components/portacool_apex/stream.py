@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .api import PortaCoolApexAPI
+from .const import STREAM_RECONNECT_MAX_SECONDS, STREAM_RECONNECT_MIN_SECONDS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _apply_event(tree: dict[str, Any], event: str, path: str, data: Any) -> dict[str, Any]:
+    """Apply a Firebase `put`/`patch` event to our mirror of the device node.
+
+    put:   replace whatever lives at `path` with `data` (None deletes it)
+    patch: merge the children in `data` into `path` (None children are deleted)
+    """
+    keys = [k for k in path.split("/") if k]
+
+    if not keys:
+        if event == "put":
+            return dict(data) if isinstance(data, dict) else {}
+        root = dict(tree)
+        if isinstance(data, dict):
+            for k, v in data.items():
+                if v is None:
+                    root.pop(k, None)
+                else:
+                    root[k] = v
+        return root
+
+    root = dict(tree)
+    node = root
+    for k in keys[:-1]:
+        child = node.get(k)
+        child = dict(child) if isinstance(child, dict) else {}
+        node[k] = child
+        node = child
+
+    leaf = keys[-1]
+    if event == "put":
+        if data is None:
+            node.pop(leaf, None)
+        else:
+            node[leaf] = data
+        return root
+
+    target = node.get(leaf)
+    target = dict(target) if isinstance(target, dict) else {}
+    if isinstance(data, dict):
+        for k, v in data.items():
+            if v is None:
+                target.pop(k, None)
+            else:
+                target[k] = v
+    node[leaf] = target
+    return root
+
+
+class PortaCoolApexStream:
+    """Keeps an RTDB event stream open for one device and hands each new node state to `on_update`.
+
+    While `connected` is True the hub skips RTDB reads for this device; when the
+    stream drops, polling takes over again until the next reconnect succeeds.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: PortaCoolApexAPI,
+        device_id: str,
+        on_update: Callable[[str, dict[int, str], dict[str, Any]], None],
+    ) -> None:
+        self._hass = hass
+        self._api = api
+        self._device_id = device_id
+        self._on_update = on_update
+
+        self._tree: dict[str, Any] = {}
+        self._connected = False
+        self._task: asyncio.Task | None = None
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    def async_start(self, entry: ConfigEntry) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._task = entry.async_create_background_task(
+            self._hass,
+            self._run(),
+            f"{entry.domain}_{entry.entry_id}_{self._device_id}_stream",
+        )
+
+    async def async_stop(self) -> None:
+        task, self._task = self._task, None
+        self._connected = False
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        failures = 0
+        while True:
+            if failures:
+                delay = min(
+                    STREAM_RECONNECT_MAX_SECONDS,
+                    STREAM_RECONNECT_MIN_SECONDS * 2 ** (failures - 1),
+                )
+                await asyncio.sleep(delay)
+
+            got_event = False
+            try:
+                async for event, path, data in self._api.stream_rtdb(self._device_id):
+                    self._tree = _apply_event(self._tree, event, path, data)
+                    self._connected = True
+                    got_event = True
+                    datapoints, timer_info = self._api._split_device_node(self._tree)
+                    self._on_update(self._device_id, datapoints, timer_info)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                _LOGGER.debug("RTDB stream for %s dropped: %s", self._device_id, err)
+            finally:
+                self._connected = False
+
+            # A stream that delivered data and then rotated/ended is healthy; reconnect now.
+            failures = 0 if got_event else failures + 1
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable, Hashable
+
+from homeassistant.core import HomeAssistant, callback
+
+# Fire a touch late so values computed with time.time() have crossed their boundary
+_SLACK_SECONDS = 0.05
+
+
+class PortaCoolApexTicker:
+    """One timer per entry that wakes time-dependent entities when their value will change.
+
+    Each entity schedules its own next transition (wall-clock timestamp) under a key;
+    only the earliest one is armed on the event loop. Callbacks are expected to
+    reschedule themselves if they have a further transition coming.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._due: dict[Hashable, tuple[float, Callable[[], None]]] = {}
+        self._handle: asyncio.TimerHandle | None = None
+        self._armed_for: float | None = None
+
+    @callback
+    def schedule(self, key: Hashable, when: float | None, action: Callable[[], None]) -> None:
+        """Run `action` at `when` (time.time() based); None drops what `key` had scheduled."""
+        if when is None:
+            self._due.pop(key, None)
+        else:
+            self._due[key] = (when, action)
+        self._arm()
+
+    @callback
+    def cancel(self, key: Hashable) -> None:
+        if self._due.pop(key, None) is not None:
+            self._arm()
+
+    @callback
+    def shutdown(self) -> None:
+        self._due.clear()
+        self._arm()
+
+    def _arm(self) -> None:
+        next_when = min((when for when, _ in self._due.values()), default=None)
+        if next_when == self._armed_for:
+            return
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._armed_for = next_when
+        if next_when is not None:
+            delay = max(0.0, next_when - time.time()) + _SLACK_SECONDS
+            self._handle = self._hass.loop.call_later(delay, self._fire)
+
+    @callback
+    def _fire(self) -> None:
+        self._handle = None
+        self._armed_for = None
+
+        now = time.time()
+        due = [(key, action) for key, (when, action) in self._due.items() if when <= now]
+        for key, _ in due:
+            del self._due[key]
+        for _, action in due:
+            action()
+        self._arm()
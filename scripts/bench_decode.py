@@ -0,0 +1,117 @@
+"""Micro-benchmark: str-based vs bytes-based decoding of cloud responses.
+
+Compares the previous path (body decoded to str, stripped, then json.loads) with
+`decode_json` on the raw bytes, using orjson when installed and the stdlib otherwise.
+
+    python scripts/bench_decode.py                 # synthetic payloads
+    python scripts/bench_decode.py devices.json …  # recorded response bodies
+
+Recorded bodies can be captured with debug logging or from diagnostics; anything that
+is a saved response body works.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from custom_components.portacool_apex import api  # noqa: E402
+
+
+def synthetic_payloads() -> dict[str, bytes]:
+    devices = {
+        "items": [
+            {
+                "uniqueId": f"PACA12001A{i:05d}",
+                "deviceTypeId": 3,
+                "deviceName": f"APEX 1200 #{i}",
+                "modelNumber": "PACA12001A1",
+                "firmwareVersion": "1.4.2",
+                "online": i % 7 != 0,
+                "location": {"lat": 33.0 + i / 1000, "lng": -97.0 - i / 1000},
+            }
+            for i in range(1000)
+        ],
+        "page": 1,
+        "pageSize": 1000,
+        "total": 1000,
+    }
+    node = {
+        "datapoints": {str(i): {"value": str(i * 3), "ts": 1700000000 + i} for i in range(1, 60)},
+        "timer": {"TimerExpiry": "2024-07-01T18:30:00Z", "TimerMode": "2"},
+    }
+    alerts = [
+        {
+            "uniqueId": f"PACA12001A{d:05d}",
+            "alerts": [
+                {
+                    "alertId": a,
+                    "alertName": f"Alert {a}",
+                    "alertType": "Warning",
+                    "value": 1,
+                    "timestamp": "2024-07-01T18:00:00Z",
+                }
+                for a in range(24)
+            ],
+        }
+        for d in range(10)
+    ]
+    return {
+        "devices_my (1000 items)": json.dumps(devices).encode(),
+        "rtdb node": json.dumps(node).encode(),
+        "alerts_latest (10 units)": json.dumps(alerts).encode(),
+    }
+
+
+def old_path(body: bytes):
+    text = body.decode("utf-8")
+    if text.strip() in ("", "null"):
+        return None
+    return json.loads(text)
+
+
+def stdlib_bytes(body: bytes):
+    if len(body) <= 8 and body.strip() in (b"", b"null"):
+        return None
+    return json.loads(body)
+
+
+def peak_alloc(func, body: bytes) -> int:
+    tracemalloc.start()
+    func(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", type=Path, help="recorded response bodies")
+    parser.add_argument("-n", "--number", type=int, default=0, help="iterations (default: auto)")
+    args = parser.parse_args()
+
+    payloads = {p.name: p.read_bytes() for p in args.files} or synthetic_payloads()
+    paths = {"str + json.loads": old_path, "bytes + json.loads": stdlib_bytes}
+    if api.orjson is not None:
+        paths["bytes + orjson"] = api.decode_json
+    else:
+        print("orjson not installed; decode_json uses the stdlib")
+
+    for name, body in payloads.items():
+        print(f"\n{name}: {len(body) / 1024:.1f} KiB")
+        for label, func in paths.items():
+            number = args.number or max(5, int(2_000_000 / max(len(body), 1)))
+            per_call = timeit.timeit(lambda: func(body), number=number) / number
+            print(
+                f"  {label:<20} {per_call * 1e6:10.1f} us/call"
+                f"   peak alloc {peak_alloc(func, body) / 1024:8.1f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""Benchmark: CPU time and allocations of the poll cycle, end to end, for 1/10/100 units.
+
+Runs the integration inside a minimal Home Assistant core against scripts/mock_cloud.py
+(in a child process, so the server's CPU is not counted) and measures, per stage:
+
+    decode            decode_json() of one RTDB node body
+    split_node        PortaCoolApexAPI._split_device_node() (datapoints + timer)
+    parse_datapoints  PortaCoolApexAPI._parse_datapoints_node()
+    build_state       DeviceState.build()
+    update            PortaCoolApexHub._async_update_data() after every unit changed
+    cycle_changed     coordinator.async_refresh() after every unit changed (entity writes included)
+    cycle_unchanged   coordinator.async_refresh() when nothing changed
+    render_<domain>   available/state/extra_state_attributes of every entity of a platform
+    render            the same for every entity of the entry
+
+CPU is process time and wall is elapsed time per run (median and p95, in ms). Allocations
+come from a separate run under tracemalloc: peak and retained KiB. The network stages
+include the client side of the HTTP round trips to the local mock.
+
+Then Home Assistant is restarted with the default options and left polling for --window
+seconds while the mock drifts every --drift seconds, to count state writes per minute.
+
+    python scripts/bench_update.py                          # 1, 10 and 100 units
+    python scripts/bench_update.py --devices 10 --runs 20 --window 30 -o before.json
+
+Results are printed as JSON (or written with --output) so two runs can be diffed.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+from homeassistant.const import __version__ as HA_VERSION
+
+# Also puts the repository root on sys.path
+from harness import (
+    async_add_entry,
+    count_state_writes,
+    entry_entities,
+    mock_cloud,
+    running_hass,
+    service_urls,
+)
+
+from custom_components.portacool_apex import api as api_module
+from custom_components.portacool_apex.api import PortaCoolApexAPI, decode_json
+from custom_components.portacool_apex.auth import PortaCoolApexAuth
+from custom_components.portacool_apex.const import (
+    DOMAIN,
+    OPTIONS_ALERTS_INTERVAL_SECONDS,
+    OPTIONS_POLL_INTERVAL_SECONDS,
+)
+from custom_components.portacool_apex.hub import device_entry_data
+from custom_components.portacool_apex.metrics import percentile
+from custom_components.portacool_apex.state import DeviceState
+
+USERNAME = "bench@example.com"
+PASSWORD = "bench"
+
+# Polling off while measuring, so only the benchmark drives the coordinator
+QUIET_OPTIONS = {OPTIONS_POLL_INTERVAL_SECONDS: 0, OPTIONS_ALERTS_INTERVAL_SECONDS: 0}
+
+
+def _timings(cpu: list[float], wall: list[float]) -> dict[str, Any]:
+    cpu, wall = sorted(cpu), sorted(wall)
+    return {
+        "runs": len(cpu),
+        "cpu_ms": round(percentile(cpu, 50) * 1000, 4),
+        "cpu_ms_p95": round(percentile(cpu, 95) * 1000, 4),
+        "wall_ms": round(percentile(wall, 50) * 1000, 4),
+        "wall_ms_p95": round(percentile(wall, 95) * 1000, 4),
+    }
+
+
+def _allocations(before: int, current: int, peak: int) -> dict[str, float]:
+    return {
+        "alloc_peak_kib": round((peak - before) / 1024, 1),
+        "alloc_retained_kib": round((current - before) / 1024, 1),
+    }
+
+
+def measure(func: Callable[[], Any], runs: int) -> dict[str, Any]:
+    cpu: list[float] = []
+    wall: list[float] = []
+    for _ in range(runs):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        func()
+        cpu.append(time.process_time() - cpu_start)
+        wall.append(time.perf_counter() - wall_start)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {**_timings(cpu, wall), **_allocations(before, current, peak)}
+
+
+async def measure_async(
+    func: Callable[[], Awaitable[Any]],
+    runs: int,
+    prepare: Callable[[], Awaitable[Any]] | None = None,
+) -> dict[str, Any]:
+    """Like measure(), awaiting func; prepare (not measured) runs before every call."""
+    cpu: list[float] = []
+    wall: list[float] = []
+    for _ in range(runs):
+        if prepare is not None:
+            await prepare()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        await func()
+        cpu.append(time.process_time() - cpu_start)
+        wall.append(time.perf_counter() - wall_start)
+
+    if prepare is not None:
+        await prepare()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    await func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {**_timings(cpu, wall), **_allocations(before, current, peak)}
+
+
+# ---------------- setup ----------------
+
+
+async def fetch_account(base_url: str) -> tuple[list[dict[str, Any]], bytes]:
+    """Device list (as stored in the config entry) and the raw RTDB node of the first unit."""
+    urls = service_urls(base_url)
+    async with aiohttp.ClientSession() as session:
+        auth = PortaCoolApexAuth(session, USERNAME, PASSWORD, api_base=base_url)
+        api = PortaCoolApexAPI(session, auth, **urls)
+        items = await api.get_devices()
+        _, uid = await api._get_firebase_id_token_and_uid()
+        body, _ = await api._request(
+            "GET",
+            f"{base_url}/users/{uid}/{items[0]['uniqueId']}.json",
+            endpoint="rtdb_node",
+            slot="rtdb",
+            auth="firebase",
+        )
+    return [device_entry_data(item) for item in items], body
+
+
+def render(entities: list) -> None:
+    for ent in entities:
+        ent.available
+        ent.state
+        ent.extra_state_attributes
+
+
+# ---------------- benchmark ----------------
+
+
+async def bench_size(devices: int, args: argparse.Namespace) -> dict[str, Any]:
+    mock_args = ("--drift", "0", "--apply-delay", "0", "--seed", str(args.seed))
+    async with mock_cloud(devices, *mock_args) as base_url, aiohttp.ClientSession() as control:
+        entry_devices, body = await fetch_account(base_url)
+
+        async def drift() -> None:
+            async with control.post(f"{base_url}/_mock/drift") as resp:
+                resp.raise_for_status()
+
+        runs = args.runs
+        node = decode_json(body)
+        datapoints, timer_info = PortaCoolApexAPI._split_device_node(node)
+        stages: dict[str, Any] = {
+            "decode": measure(lambda: decode_json(body), runs * 100),
+            "split_node": measure(lambda: PortaCoolApexAPI._split_device_node(node), runs * 100),
+            "parse_datapoints": measure(
+                lambda: PortaCoolApexAPI._parse_datapoints_node(node.get("datapoints")), runs * 100
+            ),
+            "build_state": measure(lambda: DeviceState.build(datapoints, timer_info), runs * 100),
+        }
+
+        entry_data = {"username": USERNAME, "password": PASSWORD, "devices": entry_devices}
+        async with running_hass() as hass:
+            entry = await async_add_entry(hass, base_url, entry_data, QUIET_OPTIONS)
+            hub = hass.data[DOMAIN][entry.entry_id]["hub"]
+            coordinator = hub.coordinator
+            entities = entry_entities(hass, entry)
+            all_entities = [ent for group in entities.values() for ent in group]
+            writes = count_state_writes(hass, {ent.entity_id for ent in all_entities})
+
+            async def refresh() -> None:
+                await coordinator.async_refresh()
+                if not coordinator.last_update_success:
+                    raise RuntimeError(f"refresh failed: {coordinator.last_exception}")
+
+            stages["update"] = await measure_async(hub._async_update_data, runs, prepare=drift)
+
+            writes.clear()
+            stages["cycle_changed"] = await measure_async(refresh, runs, prepare=drift)
+            stages["cycle_changed"]["state_writes_per_cycle"] = round(
+                sum(writes.values()) / (runs + 1), 1
+            )
+
+            writes.clear()
+            stages["cycle_unchanged"] = await measure_async(refresh, runs)
+            stages["cycle_unchanged"]["state_writes_per_cycle"] = round(
+                sum(writes.values()) / (runs + 1), 1
+            )
+
+            for domain, group in entities.items():
+                stages[f"render_{domain}"] = measure(lambda group=group: render(group), runs)
+            stages["render"] = measure(lambda: render(all_entities), runs)
+            entity_counts = {domain: len(group) for domain, group in entities.items()}
+
+        result: dict[str, Any] = {
+            "devices": devices,
+            "entities": entity_counts,
+            "node_bytes": len(body),
+            "stages": stages,
+        }
+        if args.window <= 0:
+            return result
+
+        # Default options: the coordinators poll on their own while the mock keeps drifting
+        async with running_hass() as hass:
+            entry = await async_add_entry(hass, base_url, entry_data)
+            entity_ids = {
+                ent.entity_id for group in entry_entities(hass, entry).values() for ent in group
+            }
+            writes = count_state_writes(hass, entity_ids)
+            cpu_start, started = time.process_time(), time.monotonic()
+            while (elapsed := time.monotonic() - started) < args.window:
+                await asyncio.sleep(min(args.drift, args.window - elapsed))
+                await drift()
+            elapsed = time.monotonic() - started
+            cpu = time.process_time() - cpu_start
+
+        result["steady_state"] = {
+            "window_seconds": round(elapsed, 1),
+            "drift_seconds": args.drift,
+            "state_writes_per_minute": round(sum(writes.values()) * 60 / elapsed, 1),
+            "state_writes_per_minute_by_domain": {
+                domain: round(count * 60 / elapsed, 1) for domain, count in sorted(writes.items())
+            },
+            # Whole process: Home Assistant core, the integration and the client side of HTTP
+            "cpu_percent": round(cpu / elapsed * 100, 2),
+        }
+        return result
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    results = {}
+    for devices in args.devices:
+        print(f"benchmarking {devices} unit(s)…", file=sys.stderr)
+        results[str(devices)] = await bench_size(devices, args)
+    return {
+        "python": sys.version.split()[0],
+        "homeassistant": HA_VERSION,
+        "orjson": api_module.orjson is not None,
+        "runs": args.runs,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 10, 100], help="unit counts")
+    parser.add_argument("--runs", type=int, default=50, help="measured runs per stage (x100 for parsing)")
+    parser.add_argument("--window", type=float, default=60.0, help="steady-state seconds (0: skip)")
+    parser.add_argument("--drift", type=float, default=5.0, help="mock telemetry drift interval")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("-o", "--output", type=Path, help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Shared plumbing of the benchmark and load-test scripts.
+
+Starts scripts/mock_cloud.py in a child process (so the server's CPU and memory are not
+counted) and a bare Home Assistant core in a throwaway config dir, and adds config
+entries pointed at the mock through their `service_urls` data.
+"""
+from __future__ import annotations
+
+import asyncio
+import socket
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant import config_entries, loader  # noqa: E402
+from homeassistant.const import EVENT_STATE_CHANGED  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import (  # noqa: E402
+    area_registry,
+    device_registry,
+    entity,
+    entity_registry,
+    issue_registry,
+)
+from homeassistant.helpers.entity_component import DATA_INSTANCES  # noqa: E402
+
+from custom_components.portacool_apex.const import CONF_SERVICE_URLS, DOMAIN  # noqa: E402
+from mock_cloud import IDENTITY_PREFIX  # noqa: E402
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def mock_cloud(devices: int, *args: str) -> AsyncIterator[str]:
+    """scripts/mock_cloud.py with extra CLI args in a child process; yields its base URL."""
+    port = _free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            str(Path(__file__).with_name("mock_cloud.py")),
+            "--port", str(port),
+            "--devices", str(devices),
+            *args,
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with aiohttp.ClientSession() as session:
+            for _ in range(100):
+                try:
+                    async with session.get(f"{base_url}/_mock/stats") as resp:
+                        if resp.status == 200:
+                            break
+                except aiohttp.ClientError:
+                    pass
+                await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("mock cloud did not start")
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def service_urls(base_url: str) -> dict[str, str]:
+    """Entry `service_urls` pointing every client at the mock."""
+    return {
+        "api_base": base_url,
+        "firebase_db": base_url,
+        "identity_base": f"{base_url}{IDENTITY_PREFIX}",
+    }
+
+
+@asynccontextmanager
+async def running_hass() -> AsyncIterator[HomeAssistant]:
+    """A started Home Assistant core with just the registries and config entries loaded."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        loader.async_setup(hass)
+        await asyncio.gather(
+            area_registry.async_load(hass),
+            device_registry.async_load(hass),
+            entity_registry.async_load(hass),
+            issue_registry.async_load(hass),
+        )
+        entity.async_setup(hass)
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        await hass.config_entries.async_initialize()
+        await hass.async_start()
+        try:
+            yield hass
+        finally:
+            for entry in hass.config_entries.async_entries(DOMAIN):
+                await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_stop()
+
+
+async def async_add_entry(
+    hass: HomeAssistant,
+    base_url: str,
+    data: dict[str, Any],
+    options: dict[str, Any] | None = None,
+) -> config_entries.ConfigEntry:
+    """Add and set up an entry of the integration against the mock; raises if it fails."""
+    entry = config_entries.ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title=data.get("device_name") or data["username"],
+        data={**data, CONF_SERVICE_URLS: service_urls(base_url)},
+        source=config_entries.SOURCE_USER,
+        options=options or {},
+    )
+    await hass.config_entries.async_add(entry)
+    await hass.async_block_till_done()
+    if entry.state is not config_entries.ConfigEntryState.LOADED:
+        raise RuntimeError(f"config entry did not load: {entry.state}")
+    return entry
+
+
+def entry_entities(hass: HomeAssistant, entry: config_entries.ConfigEntry) -> dict[str, list]:
+    """Live entity objects of the entry by platform (disabled ones are never created)."""
+    out: dict[str, list] = {}
+    for domain, component in hass.data[DATA_INSTANCES].items():
+        for ent in component.entities:
+            platform = ent.platform
+            if platform and platform.config_entry and platform.config_entry.entry_id == entry.entry_id:
+                out.setdefault(domain, []).append(ent)
+    return dict(sorted(out.items()))
+
+
+def count_state_writes(hass: HomeAssistant, entity_ids: set[str] | None = None) -> Counter[str]:
+    """Counter of state_changed events by domain, of the given entities (default: all); live."""
+    writes: Counter[str] = Counter()
+
+    def _on_state_changed(event) -> None:
+        entity_id = event.data["entity_id"]
+        if entity_ids is None or entity_id in entity_ids:
+            writes[entity_id.partition(".")[0]] += 1
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, _on_state_changed)
+    return writes
@@ -0,0 +1,269 @@
+"""Load test: event-loop lag, sockets, request rate and memory as the fleet grows.
+
+Adds one config entry per unit, each with its own login (so every entry runs its own
+signin, Firebase token exchange, coordinators and ticker), to a bare Home Assistant core
+against scripts/mock_cloud.py running in a child process. The fleet ramps through the
+--units steps; the --duration is split evenly between them, and within each step the
+process is sampled every --sample seconds:
+
+    loop_lag_ms       how late a 50 ms sleep wakes up (p50/p99/max)
+    sockets           open socket file descriptors (Linux)
+    rss_mib           resident memory (Linux)
+    scheduled         timer handles waiting on the event loop
+    requests_per_s    requests reaching the mock, from its /_mock/stats
+    state_writes_per_s
+
+Per step the JSON report has the summary and the samples; `degrades_at` is the first
+fleet size whose p99 loop lag exceeds --lag-budget (null if none did).
+
+    python scripts/load_test.py                                   # 1..100 units over an hour
+    python scripts/load_test.py --units 5 20 --duration 120 -o fleet.json
+    python scripts/load_test.py --latency 0.05 0.4 --error-rate 0.01 --token-ttl 300
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+from homeassistant.const import __version__ as HA_VERSION
+
+# Also puts the repository root on sys.path
+from harness import async_add_entry, count_state_writes, mock_cloud, running_hass
+
+from custom_components.portacool_apex.metrics import percentile
+
+# Interval of the loop lag probe
+PROBE_SECONDS = 0.05
+
+
+class LoopLagProbe:
+    """Measures how late the event loop runs a timer, every PROBE_SECONDS."""
+
+    def __init__(self) -> None:
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    def take(self) -> list[float]:
+        samples, self.samples = self.samples, []
+        return samples
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(PROBE_SECONDS)
+            self.samples.append(max(0.0, loop.time() - started - PROBE_SECONDS))
+
+
+def open_sockets() -> int | None:
+    try:
+        fds = os.listdir("/proc/self/fd")
+    except OSError:
+        return None
+    count = 0
+    for fd in fds:
+        try:
+            count += os.readlink(f"/proc/self/fd/{fd}").startswith("socket:")
+        except OSError:
+            pass
+    return count
+
+
+def rss_mib() -> float | None:
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(pages * resource.getpagesize() / 2**20, 1)
+
+
+def _lag_summary(samples: list[float]) -> dict[str, float | None]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50": None, "p99": None, "max": None}
+    return {
+        "p50": round(percentile(ordered, 50) * 1000, 2),
+        "p99": round(percentile(ordered, 99) * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2),
+    }
+
+
+async def mock_requests(session: aiohttp.ClientSession, base_url: str) -> int:
+    """Requests the mock has served (injected and random failures included)."""
+    async with session.get(f"{base_url}/_mock/stats") as resp:
+        stats = await resp.json()
+    # Failures are counted twice: under the route and under "<route> error|injected <status>"
+    return sum(
+        count
+        for route, count in stats["requests"].items()
+        if " error " not in route and " injected " not in route
+    )
+
+
+def unit_entry_data(index: int, unique_id: str) -> dict[str, Any]:
+    """A single-unit entry with a login of its own."""
+    return {
+        "username": f"load{index}@example.com",
+        "password": "load",
+        "unique_id": unique_id,
+        "device_type_id": 3,
+        "device_name": f"APEX 1200 Mock {index}",
+        "model": "PACA12001A1",
+    }
+
+
+async def run_step(
+    writes: Counter[str],
+    session: aiohttp.ClientSession,
+    base_url: str,
+    probe: LoopLagProbe,
+    units: int,
+    seconds: float,
+    sample_seconds: float,
+) -> dict[str, Any]:
+    writes.clear()
+    probe.take()
+    step_lag: list[float] = []
+    samples: list[dict[str, Any]] = []
+    requests_before = step_requests = await mock_requests(session, base_url)
+    cpu_before = time.process_time()
+    started = last = time.monotonic()
+
+    while (elapsed := time.monotonic() - started) < seconds:
+        await asyncio.sleep(min(sample_seconds, seconds - elapsed))
+        now = time.monotonic()
+        lag = probe.take()
+        step_lag.extend(lag)
+        requests = await mock_requests(session, base_url)
+        written = sum(writes.values())
+        writes.clear()
+        samples.append(
+            {
+                "t": round(now - started, 1),
+                "loop_lag_ms": _lag_summary(lag),
+                "sockets": open_sockets(),
+                "rss_mib": rss_mib(),
+                "scheduled": len(getattr(asyncio.get_running_loop(), "_scheduled", ())),
+                "requests_per_s": round((requests - step_requests) / (now - last), 2),
+                "state_writes_per_s": round(written / (now - last), 2),
+            }
+        )
+        step_requests, last = requests, now
+
+    elapsed = time.monotonic() - started
+    return {
+        "units": units,
+        "seconds": round(elapsed, 1),
+        "loop_lag_ms": _lag_summary(step_lag),
+        "cpu_percent": round((time.process_time() - cpu_before) / elapsed * 100, 2),
+        "requests_per_s": round((step_requests - requests_before) / elapsed, 2),
+        "requests_per_unit_per_min": round((step_requests - requests_before) / elapsed * 60 / units, 2),
+        "sockets_max": max((s["sockets"] or 0 for s in samples), default=None),
+        "rss_mib_max": max((s["rss_mib"] or 0 for s in samples), default=None),
+        "samples": samples,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    steps = sorted(set(args.units))
+    step_seconds = args.duration / len(steps)
+    mock_args = [
+        "--latency", str(args.latency[0]), str(args.latency[1]),
+        "--error-rate", str(args.error_rate),
+        "--token-ttl", str(args.token_ttl),
+        "--seed", str(args.seed),
+    ]
+
+    results: list[dict[str, Any]] = []
+    async with (
+        mock_cloud(steps[-1], *mock_args) as base_url,
+        aiohttp.ClientSession() as session,
+        running_hass() as hass,
+    ):
+        writes = count_state_writes(hass)
+        probe = LoopLagProbe()
+        probe.start()
+        added = 0
+        try:
+            for units in steps:
+                print(f"{units} unit(s): adding entries…", file=sys.stderr)
+                setup_started = time.monotonic()
+                for index in range(added, units):
+                    await async_add_entry(
+                        hass, base_url, unit_entry_data(index, f"MOCKAPEX{index:05d}")
+                    )
+                setup_seconds = time.monotonic() - setup_started
+                added = units
+
+                print(f"{units} unit(s): sampling for {step_seconds:.0f}s…", file=sys.stderr)
+                step = await run_step(
+                    writes, session, base_url, probe, units, step_seconds, args.sample
+                )
+                step["setup_seconds"] = round(setup_seconds, 2)
+                results.append(step)
+        finally:
+            probe.stop()
+
+    budget = args.lag_budget
+    degrades_at = next(
+        (
+            step["units"]
+            for step in results
+            if step["loop_lag_ms"]["p99"] is not None and step["loop_lag_ms"]["p99"] > budget
+        ),
+        None,
+    )
+    return {
+        "python": sys.version.split()[0],
+        "homeassistant": HA_VERSION,
+        "duration_seconds": args.duration,
+        "lag_budget_ms": budget,
+        "degrades_at": degrades_at,
+        "steps": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--units", type=int, nargs="+", default=[1, 10, 25, 50, 100], help="fleet sizes")
+    parser.add_argument("--duration", type=float, default=3600.0, help="seconds, split across the steps")
+    parser.add_argument("--sample", type=float, default=10.0, help="sampling interval, seconds")
+    parser.add_argument("--lag-budget", type=float, default=50.0, help="p99 loop lag budget, ms")
+    parser.add_argument(
+        "--latency", type=float, nargs=2, default=(0.0, 0.0), metavar=("MIN", "MAX"),
+        help="mock response latency range, seconds",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of mock requests failed")
+    parser.add_argument("--token-ttl", type=float, default=900.0, help="mock token lifetime, seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("-o", "--output", type=Path, help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
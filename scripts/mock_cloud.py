@@ -0,0 +1,529 @@
+"""Local stand-in for the PortaCool cloud and its Firebase RTDB, for tests and benchmarks.
+
+Serves every endpoint the integration talks to, for N simulated units:
+
+    POST /user-api/users/signin
+    GET  /user-api/users/firebase-custom-token
+    POST /identitytoolkit/v3/relyingparty/verifyCustomToken
+    GET  /device-api/devices/my
+    POST /device-api/devices/alerts/latest
+    POST /device-api/devices/invoke-action
+    GET  /users/<uid>/<uniqueId>.json     (plain, with X-Firebase-ETag, or as an event stream)
+
+with configurable response latency, error injection and telemetry drift. Commands land
+in RTDB after --apply-delay seconds, like the real cloud; --offline units never drift
+(an unplugged unit whose last values RTDB keeps serving). --slow adds a fixed delay to
+the requests whose path starts with a prefix, on top of --latency.
+
+    python scripts/mock_cloud.py --devices 50 --latency 0.05 0.3 --error-rate 0.02
+    python scripts/mock_cloud.py --slow /users/ 3 --slow /device-api/devices/alerts 3
+
+From Python, start it on a free port and point the clients at it:
+
+    async with MockCloud(devices=10) as cloud:
+        auth = PortaCoolApexAuth(session, "user", "pass", **cloud.auth_kwargs())
+        api = PortaCoolApexAPI(session, auth, **cloud.api_kwargs())
+
+GET /_mock/stats returns request counts per route; POST /_mock/drift moves the telemetry
+of every running unit once, right away.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from custom_components.portacool_apex.const import (  # noqa: E402
+    ALERTS_LATEST_ENDPOINT,
+    DEVICES_MY_ENDPOINT,
+    DP_AMBIENT_TEMP,
+    DP_EXIT_TEMP,
+    DP_FAN_FEEDBACK,
+    DP_FAN_SPEED,
+    DP_INTERNAL_COMPONENT_TEMP,
+    DP_POWER,
+    DP_PUMP_ENABLE,
+    DP_PUMP_MODE,
+    DP_PUMP_SPEED,
+    DP_RELATIVE_HUMIDITY,
+    DP_TIMER,
+    DP_VOLTAGE_A,
+    DP_VOLTAGE_B,
+    DP_WATER_LEVEL,
+    FIREBASE_CUSTOM_TOKEN_ENDPOINT,
+    INVOKE_ACTION_ENDPOINT,
+    POWER_VALUES,
+    SIGNIN_ENDPOINT,
+    TIMER_OPTIONS,
+    VERIFY_CUSTOM_TOKEN_ENDPOINT,
+    WATER_ALERT_EMPTY,
+    WATER_ALERT_LOW,
+)
+
+IDENTITY_PREFIX = "/identitytoolkit/v3/relyingparty"
+MOCK_UID = "mock-uid"
+
+# Fan feedback (DP7) a running unit settles at for each fan speed (DP13)
+FAN_FEEDBACK_BY_SPEED = {"0": 0, "1": 400, "2": 800, "3": 1600, "4": 2800, "5": 4000}
+TIMER_SECONDS = {"2": 1800, "3": 3600, "4": 7200, "5": 14400, "6": 28800}
+
+
+def _jwt(payload: dict[str, Any]) -> str:
+    def part(data: dict[str, Any]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+    return f"{part({'alg': 'none', 'typ': 'JWT'})}.{part(payload)}.mock"
+
+
+def _sse(event: str, data: Any) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+@dataclass
+class SimDevice:
+    """One simulated unit: its RTDB node and the streams watching it."""
+
+    unique_id: str
+    name: str
+    offline: bool = False
+    datapoints: dict[str, str] = field(default_factory=dict)
+    timer: dict[str, Any] = field(default_factory=dict)
+    # Bumped on every change; doubles as the node's ETag
+    version: int = 0
+    streams: set[asyncio.Queue] = field(default_factory=set)
+
+    def node(self) -> dict[str, Any]:
+        return {"datapoints": dict(self.datapoints), "timer": dict(self.timer)}
+
+    def etag(self) -> str:
+        return f'"{self.unique_id}-{self.version}"'
+
+    def patch_datapoints(self, changes: dict[str, str]) -> None:
+        changes = {k: v for k, v in changes.items() if self.datapoints.get(k) != v}
+        if not changes:
+            return
+        self.datapoints.update(changes)
+        self._publish("patch", "/datapoints", changes)
+
+    def put_timer(self, timer: dict[str, Any]) -> None:
+        self.timer = timer
+        self._publish("put", "/timer", timer or None)
+
+    def alerts(self) -> list[dict[str, Any]]:
+        level = self.datapoints.get(str(DP_WATER_LEVEL))
+        active = {WATER_ALERT_EMPTY} if level == "0" else {WATER_ALERT_LOW} if level == "1" else set()
+        return [
+            {
+                "alertId": f"{cat}-{n}",
+                "alertName": f"Alert {cat}-{n}",
+                "alertType": "Error" if n == 3 else "Warning",
+                "value": 2 if f"{cat}-{n}" in active else 1,
+                "timestamp": "2024-07-01T18:00:00Z",
+            }
+            for cat in range(1, 7)
+            for n in range(1, 5)
+        ]
+
+    def _publish(self, event: str, path: str, data: Any) -> None:
+        self.version += 1
+        for queue in self.streams:
+            queue.put_nowait((event, path, data))
+
+
+class MockCloud:
+    """aiohttp app standing in for api.services.portacool.com, Identity Toolkit and RTDB."""
+
+    def __init__(
+        self,
+        devices: int = 5,
+        *,
+        offline: int = 0,
+        latency: tuple[float, float] = (0.0, 0.0),
+        slow: dict[str, float] | None = None,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        drift_interval: float = 5.0,
+        apply_delay: float = 0.5,
+        token_ttl: float = 3600.0,
+        keepalive: float = 30.0,
+        seed: int | None = None,
+    ) -> None:
+        self.latency = latency
+        # path prefix -> extra seconds
+        self.slow = dict(slow or {})
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.drift_interval = drift_interval
+        self.apply_delay = apply_delay
+        self.token_ttl = token_ttl
+        self.keepalive = keepalive
+        self._random = random.Random(seed)
+
+        self.devices: dict[str, SimDevice] = {}
+        for i in range(devices):
+            unique_id = f"MOCKAPEX{i:05d}"
+            self.devices[unique_id] = SimDevice(
+                unique_id=unique_id,
+                name=f"APEX 1200 Mock {i}",
+                offline=i >= devices - offline,
+                datapoints=self._initial_datapoints(),
+            )
+
+        self.stats: Counter[str] = Counter()
+        # route prefix -> [status, remaining]; see inject()
+        self._injected: dict[str, list[int]] = {}
+        self._access_tokens: dict[str, float] = {}
+        self._id_tokens: dict[str, float] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+
+    # ---------------- lifecycle ----------------
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve on host:port (0 picks a free port); returns the base URL."""
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{bound}"
+        if self.drift_interval > 0:
+            self._spawn(self._drift())
+        return self.base_url
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> MockCloud:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.stop()
+
+    def api_kwargs(self) -> dict[str, str]:
+        """Keyword arguments pointing PortaCoolApexAPI at this server."""
+        return {
+            "api_base": self.base_url,
+            "firebase_db": self.base_url,
+            "identity_base": f"{self.base_url}{IDENTITY_PREFIX}",
+        }
+
+    def auth_kwargs(self) -> dict[str, str]:
+        """Keyword arguments pointing PortaCoolApexAuth at this server."""
+        return {"api_base": self.base_url}
+
+    def inject(self, route: str, status: int, times: int = 1) -> None:
+        """Fail the next `times` requests whose path starts with `route` with `status`."""
+        self._injected[route] = [status, times]
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post(SIGNIN_ENDPOINT, self._signin)
+        app.router.add_get(FIREBASE_CUSTOM_TOKEN_ENDPOINT, self._custom_token)
+        app.router.add_post(f"{IDENTITY_PREFIX}{VERIFY_CUSTOM_TOKEN_ENDPOINT}", self._verify)
+        app.router.add_get(DEVICES_MY_ENDPOINT, self._devices_my)
+        app.router.add_post(ALERTS_LATEST_ENDPOINT, self._alerts_latest)
+        app.router.add_post(INVOKE_ACTION_ENDPOINT, self._invoke)
+        app.router.add_get("/users/{uid}/{device}.json", self._rtdb)
+        app.router.add_get("/_mock/stats", self._stats)
+        app.router.add_post("/_mock/drift", self._drift_now)
+        return app
+
+    # ---------------- simulation ----------------
+
+    def _initial_datapoints(self) -> dict[str, str]:
+        r = self._random
+        return {
+            str(DP_POWER): POWER_VALUES[True],
+            str(DP_FAN_SPEED): "3",
+            str(DP_FAN_FEEDBACK): str(FAN_FEEDBACK_BY_SPEED["3"]),
+            str(DP_PUMP_ENABLE): "2",
+            str(DP_PUMP_MODE): "1",
+            str(DP_PUMP_SPEED): "3",
+            str(DP_TIMER): TIMER_OPTIONS["Off"],
+            str(DP_AMBIENT_TEMP): str(r.randint(80, 100)),
+            str(DP_EXIT_TEMP): str(r.randint(68, 80)),
+            str(DP_INTERNAL_COMPONENT_TEMP): str(r.randint(70, 85)),
+            str(DP_RELATIVE_HUMIDITY): f"{r.uniform(20, 60):.1f}",
+            str(DP_WATER_LEVEL): str(r.randint(2, 5)),
+            str(DP_VOLTAGE_A): "0",
+            str(DP_VOLTAGE_B): f"{r.uniform(115, 125):.1f}",
+        }
+
+    async def _drift(self) -> None:
+        """Nudge the telemetry every drift_interval seconds."""
+        while True:
+            await asyncio.sleep(self.drift_interval)
+            self.drift_once()
+
+    def drift_once(self) -> None:
+        """Nudge the telemetry of running, online units once."""
+        r = self._random
+        for device in self.devices.values():
+            dps = device.datapoints
+            if device.offline or dps.get(str(DP_POWER)) != POWER_VALUES[True]:
+                continue
+            target = FAN_FEEDBACK_BY_SPEED.get(dps.get(str(DP_FAN_SPEED), "0"), 0)
+            changes = {
+                str(DP_AMBIENT_TEMP): str(int(dps[str(DP_AMBIENT_TEMP)]) + r.choice((-1, 0, 1))),
+                str(DP_EXIT_TEMP): str(int(dps[str(DP_EXIT_TEMP)]) + r.choice((-1, 0, 1))),
+                str(DP_RELATIVE_HUMIDITY): (
+                    f"{min(100.0, max(0.0, float(dps[str(DP_RELATIVE_HUMIDITY)]) + r.uniform(-0.5, 0.5))):.1f}"
+                ),
+                str(DP_FAN_FEEDBACK): str(max(0, target + r.randint(-20, 20)) if target else 0),
+            }
+            device.patch_datapoints(changes)
+
+    async def _apply_command(self, device: SimDevice, dp_id: str, value: str) -> None:
+        await asyncio.sleep(self.apply_delay)
+        changes = {dp_id: value}
+        if dp_id == str(DP_POWER) and value == POWER_VALUES[False]:
+            changes[str(DP_FAN_FEEDBACK)] = "0"
+        elif dp_id == str(DP_FAN_SPEED):
+            changes[str(DP_FAN_FEEDBACK)] = str(FAN_FEEDBACK_BY_SPEED.get(value, 0))
+        device.patch_datapoints(changes)
+
+        if dp_id == str(DP_TIMER):
+            seconds = TIMER_SECONDS.get(value)
+            if seconds is None:
+                device.put_timer({})
+            else:
+                expiry = datetime.now(timezone.utc) + timedelta(seconds=seconds)
+                device.put_timer({"TimerExpiry": expiry.strftime("%Y-%m-%dT%H:%M:%S.%f0Z")})
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # ---------------- plumbing ----------------
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        path = request.path
+        if path.startswith("/_mock/"):
+            return await handler(request)
+
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else path
+        self.stats[route] += 1
+
+        low, high = self.latency
+        if high > 0:
+            await asyncio.sleep(self._random.uniform(low, high))
+        for prefix, seconds in self.slow.items():
+            if path.startswith(prefix):
+                await asyncio.sleep(seconds)
+
+        for prefix, injected in self._injected.items():
+            if path.startswith(prefix) and injected[1] > 0:
+                injected[1] -= 1
+                self.stats[f"{route} injected {injected[0]}"] += 1
+                return web.json_response({"error": "injected"}, status=injected[0])
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.stats[f"{route} error {self.error_status}"] += 1
+            return web.json_response({"error": "random failure"}, status=self.error_status)
+        return await handler(request)
+
+    def _issue(self, store: dict[str, float], token: str) -> str:
+        store[token] = time.time() + self.token_ttl
+        return token
+
+    @staticmethod
+    def _valid(store: dict[str, float], token: str | None) -> bool:
+        return token is not None and store.get(token, 0) > time.time()
+
+    def _require_bearer(self, request: web.Request) -> None:
+        header = request.headers.get("Authorization", "")
+        token = header[7:] if header.startswith("Bearer ") else None
+        if not self._valid(self._access_tokens, token):
+            raise web.HTTPUnauthorized(text="invalid or expired access token")
+
+    def _device(self, unique_id: Any) -> SimDevice:
+        device = self.devices.get(unique_id)
+        if device is None:
+            raise web.HTTPNotFound(text=f"unknown device {unique_id}")
+        return device
+
+    # ---------------- handlers ----------------
+
+    async def _signin(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if not body.get("username") or not body.get("password"):
+            raise web.HTTPUnauthorized(text="bad credentials")
+        token = self._issue(self._access_tokens, f"mock-access-{len(self._access_tokens)}")
+        return web.json_response({"access_token": token, "expires_in": int(self.token_ttl)})
+
+    async def _custom_token(self, request: web.Request) -> web.Response:
+        self._require_bearer(request)
+        return web.json_response({"token": _jwt({"uid": MOCK_UID, "iat": int(time.time())})})
+
+    async def _verify(self, request: web.Request) -> web.Response:
+        if not request.query.get("key"):
+            raise web.HTTPBadRequest(text="API key missing")
+        body = await request.json()
+        if not isinstance(body.get("token"), str) or body["token"].count(".") < 2:
+            raise web.HTTPBadRequest(text="INVALID_CUSTOM_TOKEN")
+        exp = int(time.time() + self.token_ttl)
+        id_token = self._issue(
+            self._id_tokens, _jwt({"user_id": MOCK_UID, "exp": exp, "n": len(self._id_tokens)})
+        )
+        return web.json_response(
+            {"idToken": id_token, "refreshToken": "mock", "expiresIn": str(int(self.token_ttl))}
+        )
+
+    async def _devices_my(self, request: web.Request) -> web.Response:
+        self._require_bearer(request)
+        items = [
+            {
+                "uniqueId": d.unique_id,
+                "deviceTypeId": 3,
+                "deviceName": d.name,
+                "modelNumber": "PACA12001A1",
+            }
+            for d in self.devices.values()
+        ]
+        return web.json_response({"items": items, "page": 1, "pageSize": len(items), "total": len(items)})
+
+    async def _alerts_latest(self, request: web.Request) -> web.Response:
+        self._require_bearer(request)
+        body = await request.json()
+        return web.json_response(
+            [
+                {"uniqueId": uid, "alerts": self.devices[uid].alerts()}
+                for uid in body.get("uniqueIds", [])
+                if uid in self.devices
+            ]
+        )
+
+    async def _invoke(self, request: web.Request) -> web.Response:
+        self._require_bearer(request)
+        body = await request.json()
+        device = self._device(body.get("uniqueId"))
+        self._spawn(self._apply_command(device, str(body["datapointId"]), str(body["value"])))
+        return web.json_response({"success": True})
+
+    async def _rtdb(self, request: web.Request) -> web.StreamResponse:
+        id_token = request.query.get("auth")
+        if request.match_info["uid"] != MOCK_UID or not self._valid(self._id_tokens, id_token):
+            return web.json_response({"error": "Permission denied"}, status=401)
+        device = self._device(request.match_info["device"])
+
+        if request.headers.get("Accept") == "text/event-stream":
+            return await self._rtdb_stream(request, device, id_token)
+
+        headers = {"ETag": device.etag()} if request.headers.get("X-Firebase-ETag") == "true" else {}
+        return web.json_response(device.node(), headers=headers)
+
+    async def _rtdb_stream(
+        self, request: web.Request, device: SimDevice, id_token: str
+    ) -> web.StreamResponse:
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        await resp.write(_sse("put", {"path": "/", "data": device.node()}))
+
+        queue: asyncio.Queue = asyncio.Queue()
+        device.streams.add(queue)
+        try:
+            while True:
+                expires_in = self._id_tokens.get(id_token, 0) - time.time()
+                if expires_in <= 0:
+                    await resp.write(b"event: auth_revoked\ndata: credential is no longer valid\n\n")
+                    break
+                try:
+                    event, path, data = await asyncio.wait_for(
+                        queue.get(), min(self.keepalive, expires_in)
+                    )
+                except asyncio.TimeoutError:
+                    await resp.write(b"event: keep-alive\ndata: null\n\n")
+                    continue
+                await resp.write(_sse(event, {"path": path, "data": data}))
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            device.streams.discard(queue)
+        return resp
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "requests": dict(sorted(self.stats.items())),
+                "streams": sum(len(d.streams) for d in self.devices.values()),
+            }
+        )
+
+    async def _drift_now(self, request: web.Request) -> web.Response:
+        self.drift_once()
+        return web.json_response({"ok": True})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8770)
+    parser.add_argument("--devices", type=int, default=5, help="simulated units")
+    parser.add_argument("--offline", type=int, default=0, help="units whose telemetry never moves")
+    parser.add_argument(
+        "--latency", type=float, nargs=2, default=(0.0, 0.0), metavar=("MIN", "MAX"),
+        help="added response latency range, seconds",
+    )
+    parser.add_argument(
+        "--slow", nargs=2, action="append", default=[], metavar=("PREFIX", "SECONDS"),
+        help="extra latency of the requests whose path starts with PREFIX (repeatable)",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failed")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--drift", type=float, default=5.0, help="telemetry drift interval (0: off)")
+    parser.add_argument("--apply-delay", type=float, default=0.5, help="command -> RTDB delay, seconds")
+    parser.add_argument("--token-ttl", type=float, default=3600.0, help="access/id token lifetime")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    cloud = MockCloud(
+        args.devices,
+        offline=args.offline,
+        latency=tuple(args.latency),
+        slow={prefix: float(seconds) for prefix, seconds in args.slow},
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        drift_interval=args.drift,
+        apply_delay=args.apply_delay,
+        token_ttl=args.token_ttl,
+        seed=args.seed,
+    )
+
+    async def run() -> None:
+        base = await cloud.start(args.host, args.port)
+        print(f"Mock PortaCool cloud on {base} ({args.devices} units)")
+        print(f"  api_base={base} firebase_db={base} identity_base={base}{IDENTITY_PREFIX}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await cloud.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
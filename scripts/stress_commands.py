@@ -0,0 +1,187 @@
+"""Stress test: do device commands stay fast while the polling endpoints are slow?
+
+Each endpoint group has its own concurrency slot (see ENDPOINT_CONCURRENCY in api.py),
+so a backlog of slow RTDB or alerts reads should not hold up commands. This starts
+scripts/mock_cloud.py with the RTDB and alerts routes slowed down by --slow seconds,
+then runs two phases of --duration seconds each, on a fresh API client against it:
+
+    baseline     --concurrency workers sending invokes back to back
+    contended    the same, while --background RTDB reads and as many alerts POSTs are
+                 kept in flight, well past their slot limits
+
+and reports, per phase, the invoke latency seen by the caller (p50/p95/max) and the
+client's request stats: latency and slot wait of the invoke, RTDB and alerts endpoints.
+With isolation working, the contended invoke latency stays close to the baseline while
+the RTDB and alerts requests queue for their slots.
+
+    python scripts/stress_commands.py
+    python scripts/stress_commands.py --slow 5 --background 32 --duration 30 -o stress.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+from homeassistant.const import __version__ as HA_VERSION
+
+# Also puts the repository root on sys.path
+from harness import mock_cloud, service_urls
+
+from custom_components.portacool_apex.api import ENDPOINT_CONCURRENCY, PortaCoolApexAPI
+from custom_components.portacool_apex.auth import PortaCoolApexAuth
+from custom_components.portacool_apex.const import ALERTS_LATEST_ENDPOINT, DP_FAN_SPEED
+from custom_components.portacool_apex.metrics import latency_summary
+
+USERNAME = "stress@example.com"
+PASSWORD = "stress"
+
+# Request stats reported per phase
+REPORTED_ENDPOINTS = ("invoke", "rtdb_node", "alerts")
+
+
+def _ms(summary: dict[str, Any]) -> dict[str, Any]:
+    return {
+        key: round(value * 1000, 1) if key in ("p50", "p95", "max") and value is not None else value
+        for key, value in summary.items()
+    }
+
+
+async def new_client(session: aiohttp.ClientSession, base_url: str) -> tuple[PortaCoolApexAPI, list[dict]]:
+    """A signed-in API client with its Firebase identity, and the account's units."""
+    urls = service_urls(base_url)
+    auth = PortaCoolApexAuth(session, USERNAME, PASSWORD, api_base=base_url)
+    api = PortaCoolApexAPI(session, auth, **urls)
+    items = await api.get_devices()
+    await api._get_firebase_id_token_and_uid()
+    return api, items
+
+
+async def send_commands(api: PortaCoolApexAPI, items: list[dict], args: argparse.Namespace) -> list[float]:
+    """Wall-clock latency of every invoke sent by --concurrency workers for --duration seconds."""
+    deadline = time.monotonic() + args.duration
+    latencies: list[float] = []
+
+    async def worker(offset: int) -> None:
+        index = offset
+        while time.monotonic() < deadline:
+            item = items[index % len(items)]
+            started = time.perf_counter()
+            await api.invoke(item["uniqueId"], item["deviceTypeId"], DP_FAN_SPEED, str(index % 5 + 1))
+            latencies.append(time.perf_counter() - started)
+            index += args.concurrency
+
+    await asyncio.gather(*(worker(offset) for offset in range(args.concurrency)))
+    return latencies
+
+
+async def keep_busy(api: PortaCoolApexAPI, items: list[dict], workers: int) -> None:
+    """Keep `workers` RTDB reads and `workers` alerts POSTs in flight until cancelled."""
+    device_ids = [item["uniqueId"] for item in items]
+
+    async def rtdb(worker: int) -> None:
+        while True:
+            await api.get_rtdb_state(device_ids[worker % len(device_ids)])
+
+    async def alerts() -> None:
+        while True:
+            await api.get_alerts_latest(device_ids)
+
+    await asyncio.gather(
+        *(rtdb(worker) for worker in range(workers)),
+        *(alerts() for _ in range(workers)),
+    )
+
+
+async def run_phase(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    args: argparse.Namespace,
+    contended: bool,
+) -> dict[str, Any]:
+    # A fresh client per phase, so its request stats cover that phase only
+    api, items = await new_client(session, base_url)
+    background = None
+    if contended:
+        background = asyncio.create_task(keep_busy(api, items, args.background))
+        # Let the slow requests fill their slots before the first command goes out
+        await asyncio.sleep(0.5)
+    started = time.monotonic()
+    try:
+        latencies = await send_commands(api, items, args)
+    finally:
+        if background is not None:
+            background.cancel()
+            await asyncio.gather(background, return_exceptions=True)
+    stats = api.request_stats()
+    return {
+        "seconds": round(time.monotonic() - started, 2),
+        "invoke_latency_ms": _ms(latency_summary(latencies)),
+        "requests": {
+            name: {
+                "requests": stats[name]["requests"],
+                "errors": stats[name]["errors"],
+                "latency_ms": _ms(stats[name]["latency"]),
+                "slot_wait_ms": _ms(stats[name]["slot_wait"]),
+            }
+            for name in REPORTED_ENDPOINTS
+        },
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    mock_args = (
+        "--slow", "/users/", str(args.slow),
+        "--slow", ALERTS_LATEST_ENDPOINT, str(args.slow),
+        "--drift", "0",
+        "--apply-delay", "0",
+        "--seed", str(args.seed),
+    )
+    async with mock_cloud(args.devices, *mock_args) as base_url, aiohttp.ClientSession() as session:
+        print("baseline: commands only…", file=sys.stderr)
+        baseline = await run_phase(session, base_url, args, contended=False)
+        print(f"contended: commands with {args.background} slow reads of each kind…", file=sys.stderr)
+        contended = await run_phase(session, base_url, args, contended=True)
+
+    base_p95 = baseline["invoke_latency_ms"]["p95"]
+    contended_p95 = contended["invoke_latency_ms"]["p95"]
+    return {
+        "python": sys.version.split()[0],
+        "homeassistant": HA_VERSION,
+        "endpoint_concurrency": ENDPOINT_CONCURRENCY,
+        "slow_seconds": args.slow,
+        "duration_seconds": args.duration,
+        "concurrency": args.concurrency,
+        "background": args.background,
+        "invoke_p95_slowdown": round(contended_p95 / base_p95, 2) if base_p95 else None,
+        "phases": {"baseline": baseline, "contended": contended},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=10, help="simulated units")
+    parser.add_argument("--slow", type=float, default=3.0, help="added RTDB and alerts latency, seconds")
+    parser.add_argument("--background", type=int, default=16, help="slow reads of each kind in flight")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per phase")
+    parser.add_argument("--concurrency", type=int, default=4, help="invokes in flight at a time")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("-o", "--output", type=Path, help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()